@@ -12,6 +12,7 @@ from app.core.config import settings
 # Import all models here so Alembic can discover them
 import app.models.user
 import app.models.task
+import app.models.task_outbox
 
 
 load_dotenv()
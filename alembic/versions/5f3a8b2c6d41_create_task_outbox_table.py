@@ -0,0 +1,30 @@
+"""create_task_outbox_table
+
+Revision ID: 5f3a8b2c6d41
+Revises: 9c1d7e5a3b20
+Create Date: 2026-10-17 11:04:52.918733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f3a8b2c6d41'
+down_revision = '9c1d7e5a3b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('task_outbox',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('task_id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_outbox')
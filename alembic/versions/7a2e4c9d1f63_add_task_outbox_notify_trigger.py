@@ -0,0 +1,38 @@
+"""add_task_outbox_notify_trigger
+
+Revision ID: 7a2e4c9d1f63
+Revises: 5f3a8b2c6d41
+Create Date: 2026-10-17 18:21:07.514290
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2e4c9d1f63'
+down_revision = '5f3a8b2c6d41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Wakes the outbox relays (LISTEN task_outbox) when new entries commit.
+    # Once per statement, so a batch insert sends a single notification.
+    op.execute("""
+        CREATE FUNCTION notify_task_outbox() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('task_outbox', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER task_outbox_notify
+        AFTER INSERT ON task_outbox
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_task_outbox()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER task_outbox_notify ON task_outbox")
+    op.execute("DROP FUNCTION notify_task_outbox()")
@@ -0,0 +1,39 @@
+"""add_tasks_user_created_at_index
+
+Revision ID: 9c1d7e5a3b20
+Revises: 4e6e8a09204d
+Create Date: 2026-10-17 10:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c1d7e5a3b20'
+down_revision = '4e6e8a09204d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the task listing (newest first, keyset on created_at, id)
+    # without sorting; built concurrently so writes are not blocked.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_id_created_at',
+            'tasks',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_user_id_created_at',
+            table_name='tasks',
+            postgresql_concurrently=True,
+        )
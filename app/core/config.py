@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -5,13 +7,122 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     REDIS_URL: str
     SECRET_KEY: str
-    REPLICATE_API_TOKEN: str
-    GOOGLE_APPLICATION_CREDENTIALS: str
-    GOOGLE_CREDENTIALS_JSON: str
+    REPLICATE_API_TOKEN: Optional[str] = None
+    GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = None
+    GOOGLE_CREDENTIALS_JSON: Optional[str] = None
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Serialization: "orjson" or "json"
+    JSON_SERIALIZER: str = "orjson"
+
+    # Database
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = 30000
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+
+    # Task creation
+    TASK_BATCH_MAX_SIZE: int = 50
+    # Run the outbox relay in each API worker. When disabled, run at least one
+    # standalone relay (python -m consumer.relay), or no task is ever queued.
+    OUTBOX_RELAY_ENABLED: bool = True
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    # Relays wake on NOTIFY; this is the fallback poll for missed notifications
+    OUTBOX_RELAY_INTERVAL: float = 5.0
+
+    # Task creation rate limits (sliding window)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_WINDOW: float = 60.0
+    # Must be at least TASK_BATCH_MAX_SIZE, or full batches can never pass
+    RATE_LIMIT_USER_MAX_TASKS: int = 60
+    RATE_LIMIT_GLOBAL_MAX_TASKS: int = 1000
+
+    # Admission control: reject new tasks while consumers are too far behind
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_QUEUE_DEPTH: int = 1000
+    # Reject when the estimated wait exceeds this many seconds; None to disable
+    ADMISSION_MAX_WAIT: Optional[float] = None
+    ADMISSION_RETRY_AFTER_MAX: int = 300
+    # Seconds of completions used to estimate consumer throughput
+    THROUGHPUT_WINDOW: float = 300.0
+
+    # Task listing
+    TASK_PAGE_SIZE_DEFAULT: int = 50
+    TASK_PAGE_SIZE_MAX: int = 200
+
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+
+    # Image storage: "gcs" or "local"
+    STORAGE_BACKEND: str = "gcs"
+    GCS_BUCKET_NAME: str = "pet-tee"
+    LOCAL_STORAGE_ROOT: str = "storage"
+    LOCAL_STORAGE_BASE_URL: str = "http://localhost:8000"
+
+    # Signed image URLs
+    SIGNED_URL_EXPIRATION: int = 3600
+    SIGNED_URL_REFRESH_MARGIN: int = 300
+    SIGNED_URL_CACHE_SIZE: int = 10000
+    SIGNED_URL_REDIS_CACHE: bool = False
+    # Maximum signing calls in flight per worker
+    SIGNED_URL_SIGN_CONCURRENCY: int = 16
+
+    # Server-Sent Events
+    SSE_HEARTBEAT_INTERVAL: float = 15.0
+    SSE_CLIENT_QUEUE_SIZE: int = 100
+    SSE_CLIENT_QUEUE_POLICY: str = "coalesce"
+
+    # Prometheus metrics: /metrics on the API, a plain HTTP port on the consumer
+    METRICS_ENABLED: bool = True
+    CONSUMER_METRICS_PORT: Optional[int] = 9100
+
+    # Request latency instrumentation: per-route histograms, db / redis /
+    # signing breakdown and slow request stacks
+    REQUEST_INSTRUMENTATION_ENABLED: bool = False
+    SLOW_REQUEST_THRESHOLD: Optional[float] = 1.0
+    # Fraction of requests whose stack is captured if they become slow
+    SLOW_REQUEST_SAMPLE_RATE: float = 1.0
+
+    # Task queue
+    TASK_QUEUE_NAME: str = "generate_image_queue"
+    TASK_QUEUE_RELIABLE: bool = False
+    TASK_QUEUE_HEARTBEAT_TTL: int = 30
+    TASK_QUEUE_REAP_INTERVAL: float = 10.0
+
+    # Consumer
+    CONSUMER_ID: Optional[str] = None
+    CONSUMER_CONCURRENCY: int = 1
+    CONSUMER_THREAD_POOL_SIZE: Optional[int] = None
+    CONSUMER_DRAIN_TIMEOUT: float = 60.0
+    IMAGE_DOWNLOAD_CHUNK_SIZE: int = 64 * 1024
+    # Must be a multiple of 256 KiB
+    IMAGE_UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+
+    # Generation cache: "off", "reuse" or "pool"
+    GENERATION_CACHE_MODE: str = "off"
+    GENERATION_CACHE_POOL_SIZE: int = 3
+    GENERATION_CACHE_TTL: int = 7 * 24 * 60 * 60
+    GENERATION_CACHE_LOCK_TTL: int = 300
+
+    # Image generator: "replicate" or "stub" (local, for load tests)
+    IMAGE_GENERATOR: str = "replicate"
+    REPLICATE_MODEL: str = "black-forest-labs/flux-schnell"
+    STUB_IMAGE_WIDTH: int = 512
+    STUB_IMAGE_HEIGHT: int = 512
+    # Latency distribution: "fixed", "uniform" or "lognormal"
+    STUB_LATENCY_DISTRIBUTION: str = "lognormal"
+    STUB_LATENCY_MEAN: float = 2.0
+    STUB_LATENCY_STDDEV: float = 0.5
+    STUB_SEED: Optional[int] = None
+
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
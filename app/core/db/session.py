@@ -1,24 +1,68 @@
+from functools import lru_cache
+
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker as async_sessionmaker
 from sqlalchemy.orm import sessionmaker as sync_sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
 
 Base = declarative_base()
 
-sync_engine = create_engine(settings.SYNC_DATABASE_URL)
-SyncSessionLocal = sync_sessionmaker(bind=sync_engine, autocommit=False, autoflush=False)
+
+def _pool_options() -> dict:
+    return {
+        "echo": settings.DB_ECHO,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# The API never touches the sync engine, so it is only built on first use
+@lru_cache(maxsize=None)
+def get_sync_engine():
+    return create_engine(settings.SYNC_DATABASE_URL, **_pool_options())
+
+
+@lru_cache(maxsize=None)
+def get_sync_sessionmaker():
+    return sync_sessionmaker(bind=get_sync_engine(), autocommit=False, autoflush=False)
+
 
 def get_sync_db():
-    db = SyncSessionLocal()
+    db = get_sync_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
 
-async_engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
+
+def _create_async_engine():
+    url = make_url(settings.DATABASE_URL)
+    connect_args = {}
+
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "asyncpg":
+        # Size of SQLAlchemy's per-connection asyncpg prepared statement cache
+        url = url.update_query_dict({
+            "prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)
+        })
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+            }
+
+    return create_async_engine(url, future=True, connect_args=connect_args, **_pool_options())
+
+
+async_engine = _create_async_engine()
+if settings.REQUEST_INSTRUMENTATION_ENABLED:
+    instrument_engine(async_engine.sync_engine)
 AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_db():
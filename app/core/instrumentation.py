@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import random
+import traceback
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+
+import redis.asyncio as redis
+from prometheus_client import Histogram
+from redis.asyncio.client import Pipeline
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+COMPONENTS = ("db", "redis", "signing")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request; time to first byte for event streams",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_COMPONENT_SECONDS = Histogram(
+    "http_request_component_seconds",
+    "Time a request spent waiting on a component",
+    ["route", "component"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class RequestTimings:
+    """Seconds spent per component by the current request"""
+    __slots__ = COMPONENTS
+
+    def __init__(self):
+        self.db = 0.0
+        self.redis = 0.0
+        self.signing = 0.0
+
+    def __str__(self) -> str:
+        return " ".join(f"{name}={getattr(self, name) * 1000:.1f}ms" for name in COMPONENTS)
+
+
+# Set only while the middleware handles a request, so everything below is a
+# no-op in the consumer and outside requests. The object is shared (not
+# copied) with threads and greenlets that inherit the context.
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class timed:
+    """
+    Add the time spent in the block to a component of the current request
+
+    Concurrent blocks of one request are summed, so a component can exceed
+    the request's wall time.
+    """
+    __slots__ = ("component", "timings", "start")
+
+    def __init__(self, component: str):
+        self.component = component
+
+    def __enter__(self):
+        self.timings = _current_timings.get()
+        if self.timings is not None:
+            self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            elapsed = perf_counter() - self.start
+            setattr(self.timings, self.component, getattr(self.timings, self.component) + elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count cursor execution time of `engine` as db time"""
+
+    # The start time lives on the per-statement execution context, so a failed
+    # statement leaves nothing behind on the pooled connection
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_timings.get() is not None:
+            context._query_start = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        timings = _current_timings.get()
+        start = getattr(context, "_query_start", None)
+        if timings is not None and start is not None:
+            timings.db += perf_counter() - start
+
+
+# (frame, awaited object) attributes of coroutines, generators and async generators
+_AWAIT_ATTRS = (("cr_frame", "cr_await"), ("gi_frame", "gi_yieldfrom"), ("ag_frame", "ag_await"))
+
+
+def format_await_chain(task: asyncio.Task) -> str:
+    """
+    Stack of a suspended task, from its coroutine down to the innermost await
+
+    Task.print_stack() shows only the outermost frame of a suspended task,
+    so the chain of awaited coroutines is followed instead.
+    """
+    frames = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = None
+        for frame_attr, await_attr in _AWAIT_ATTRS:
+            if hasattr(awaitable, frame_attr):
+                frame = getattr(awaitable, frame_attr)
+                awaitable = getattr(awaitable, await_attr)
+                break
+        if frame is None:
+            # A future or finished coroutine ends the chain
+            break
+        frames.append((frame, frame.f_lineno))
+    return "".join(traceback.StackSummary.extract(frames).format())
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        with timed("redis"):
+            return await super().execute(raise_on_error)
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that counts command round-trips as redis time"""
+
+    async def execute_command(self, *args, **options):
+        with timed("redis"):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class RequestLatencyMiddleware:
+    """
+    Records per-route latency and the db / redis / signing breakdown of
+    every HTTP request, and adds it as a Server-Timing header.
+
+    Requests still running after `slow_threshold` seconds get their task's
+    stack logged (for a `sample_rate` fraction of requests), which shows
+    what they are waiting on. Event streams are measured up to their first
+    byte and never reported as slow.
+    """
+
+    def __init__(self, app: ASGIApp, slow_threshold: Optional[float] = None, sample_rate: float = 1.0):
+        self.app = app
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+
+    @staticmethod
+    def route_path(scope: Scope) -> str:
+        # Set by the router on a match; the template keeps label cardinality bounded
+        route = scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    def observe(self, scope: Scope, status_code: int, duration: float, timings: RequestTimings) -> None:
+        route = self.route_path(scope)
+        REQUEST_SECONDS.labels(scope["method"], route, str(status_code)).observe(duration)
+        for component in COMPONENTS:
+            REQUEST_COMPONENT_SECONDS.labels(route, component).observe(getattr(timings, component))
+
+    def log_stack(self, task: asyncio.Task, scope: Scope, start: float, timings: RequestTimings) -> None:
+        logger.warning(
+            f"Slow request {scope['method']} {scope['path']} still running after "
+            f"{perf_counter() - start:.3f}s ({timings})\n{format_await_chain(task)}"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = perf_counter()
+        status_code = 500
+        streaming = False
+
+        stack_probe = None
+        if self.slow_threshold is not None and random.random() < self.sample_rate:
+            stack_probe = asyncio.get_running_loop().call_later(
+                self.slow_threshold, self.log_stack, asyncio.current_task(), scope, start, timings
+            )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                streaming = any(
+                    name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in headers
+                )
+                server_timing = ", ".join(
+                    f"{name};dur={getattr(timings, name) * 1000:.1f}" for name in COMPONENTS
+                )
+                headers.append((b"server-timing", server_timing.encode()))
+                message["headers"] = headers
+                if streaming:
+                    self.observe(scope, status_code, perf_counter() - start, timings)
+                    if stack_probe is not None:
+                        stack_probe.cancel()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_timings.reset(token)
+            if stack_probe is not None:
+                stack_probe.cancel()
+            if not streaming:
+                duration = perf_counter() - start
+                self.observe(scope, status_code, duration, timings)
+                if self.slow_threshold is not None and duration >= self.slow_threshold:
+                    logger.warning(
+                        f"Slow request {scope['method']} {self.route_path(scope)} "
+                        f"took {duration:.3f}s with status {status_code} ({timings})"
+                    )
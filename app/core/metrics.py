@@ -0,0 +1,46 @@
+from prometheus_client import Gauge
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.services.task_event_hub import TaskEventHub
+
+# Refreshed from Redis on every scrape of /metrics
+QUEUE_DEPTH = Gauge(
+    "task_queue_depth",
+    "Task IDs waiting in the generation queue",
+)
+QUEUE_SHARED_DEPTH = Gauge(
+    "task_queue_shared_depth",
+    "Task IDs waiting in the shared (requeued and legacy) queue",
+)
+QUEUE_ACTIVE_USERS = Gauge(
+    "task_queue_active_users",
+    "Users with queued tasks",
+    ["lane"],
+)
+CONSUMER_THROUGHPUT = Gauge(
+    "task_consumer_throughput",
+    "Tasks finished per second by all consumers over THROUGHPUT_WINDOW",
+)
+
+
+class TaskEventHubCollector(Collector):
+    """Exposes the SSE fan-out counters of this worker's TaskEventHub"""
+
+    def __init__(self, hub: TaskEventHub):
+        self.hub = hub
+
+    def collect(self):
+        metrics = self.hub.metrics()
+        yield GaugeMetricFamily(
+            "sse_connected_clients", "Open SSE task streams", value=metrics["connected_clients"]
+        )
+        yield GaugeMetricFamily(
+            "sse_subscribed_users", "Users with at least one open SSE task stream", value=metrics["subscribed_users"]
+        )
+        yield CounterMetricFamily(
+            "sse_delivered_events", "Task events queued to SSE clients", value=metrics["delivered_events"]
+        )
+        yield CounterMetricFamily(
+            "sse_dropped_events", "Task events dropped or coalesced for slow SSE clients", value=metrics["dropped_events"]
+        )
@@ -2,6 +2,7 @@ import json
 from typing import Any, Dict, Optional, Union, List, Tuple
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.instrumentation import InstrumentedRedis
 
 
 class RedisClient:
@@ -11,7 +12,8 @@ class RedisClient:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(RedisClient, cls).__new__(cls)
-            cls._client = redis.from_url(settings.REDIS_URL)
+            client_class = InstrumentedRedis if settings.REQUEST_INSTRUMENTATION_ENABLED else redis.Redis
+            cls._client = client_class.from_url(settings.REDIS_URL)
         return cls._instance
 
     @classmethod
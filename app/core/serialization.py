@@ -0,0 +1,58 @@
+import datetime
+import enum
+import json
+from typing import Any, Callable, Dict
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_json(obj: Any) -> bytes:
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _dumps_orjson(obj: Any) -> bytes:
+    # UUID, datetime and enum members are encoded natively by orjson
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+SERIALIZERS: Dict[str, Callable[[Any], bytes]] = {"json": _dumps_json}
+if orjson is not None:
+    SERIALIZERS["orjson"] = _dumps_orjson
+
+_dumps: Callable[[Any], bytes] = SERIALIZERS.get("orjson", _dumps_json)
+
+
+def use_serializer(name: str) -> None:
+    """Select the serializer used by dumps(); unknown or missing ones fall back to stdlib json"""
+    global _dumps
+    _dumps = SERIALIZERS.get(name, _dumps_json)
+
+
+def dumps(obj: Any) -> bytes:
+    return _dumps(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with the configured serializer"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
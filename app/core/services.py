@@ -1,11 +1,14 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from typing import Annotated
 
 from app.core.db.session import get_db
 from app.core.redis import get_redis
 from app.services.task_service import TaskService
 from app.services.redis_service import RedisService
+from app.services.rate_limiter import RateLimiter
+from app.services.admission import AdmissionController
 from app.services.auth_service import AuthService
+from app.services.task_event_hub import TaskEventHub
 
 
 def get_redis_service(redis=Depends(get_redis)):
@@ -16,11 +19,26 @@ def get_task_service(redis_service: RedisService = Depends(get_redis_service), d
     return TaskService(db, redis_service)
 
 
+def get_rate_limiter(redis_service: RedisService = Depends(get_redis_service)):
+    return RateLimiter(redis_service)
+
+
+def get_admission_controller(redis_service: RedisService = Depends(get_redis_service)):
+    return AdmissionController(redis_service)
+
+
 def get_auth_service(db=Depends(get_db)):
     return AuthService(db)
 
 
+def get_task_event_hub(request: Request) -> TaskEventHub:
+    return request.app.state.task_event_hub
+
+
 # Type annotations for cleaner dependency injection
 TaskServiceDep = Annotated[TaskService, Depends(get_task_service)]
 RedisServiceDep = Annotated[RedisService, Depends(get_redis_service)]
+RateLimiterDep = Annotated[RateLimiter, Depends(get_rate_limiter)]
+AdmissionControllerDep = Annotated[AdmissionController, Depends(get_admission_controller)]
 AuthServiceDep = Annotated[AuthService, Depends(get_auth_service)]
+TaskEventHubDep = Annotated[TaskEventHub, Depends(get_task_event_hub)]
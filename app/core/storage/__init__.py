@@ -0,0 +1,41 @@
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import settings
+from .base import StorageBackend, ChecksumReader
+from .gcs import GCSStorageBackend
+from .local import LocalStorageBackend
+
+
+def create_storage_backend(credentials_json: Optional[str] = None, pool_size: int = 10) -> StorageBackend:
+    """Build the backend selected by STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(
+            root=settings.LOCAL_STORAGE_ROOT,
+            base_url=settings.LOCAL_STORAGE_BASE_URL,
+            secret=settings.SECRET_KEY,
+        )
+    if settings.STORAGE_BACKEND == "gcs":
+        return GCSStorageBackend(
+            bucket_name=settings.GCS_BUCKET_NAME,
+            credentials_json=credentials_json,
+            pool_size=pool_size,
+            upload_chunk_size=settings.IMAGE_UPLOAD_CHUNK_SIZE,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+
+@lru_cache(maxsize=None)
+def get_storage_backend() -> StorageBackend:
+    """Process-wide backend used by the API, created on first use"""
+    return create_storage_backend()
+
+
+__all__ = [
+    "StorageBackend",
+    "ChecksumReader",
+    "GCSStorageBackend",
+    "LocalStorageBackend",
+    "create_storage_backend",
+    "get_storage_backend",
+]
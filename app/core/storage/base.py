@@ -0,0 +1,131 @@
+import base64
+import hashlib
+import io
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+
+class ChecksumReader(io.BufferedIOBase):
+    """
+    File-like view over an iterator of byte chunks.
+
+    `read(n)` returns exactly `n` bytes until the stream ends, as the GCS
+    multipart and resumable uploads expect, and `tell()` reports the stream
+    position. Only the most recent read can be rewound (for retried upload
+    chunks); everything before it has already been let go. The size and MD5
+    of everything pulled from the iterator are tracked, so stored objects
+    can be verified without a temp file.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = iter(chunks)
+        # Pulled from the iterator but not read yet
+        self._pending = bytearray()
+        self._position = 0
+        # The last block returned by read() and where it started
+        self._last_block = b""
+        self._last_block_start = 0
+        self.size = 0
+        self.md5 = hashlib.md5()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("Can only seek relative to the start or the current position")
+
+        if offset == self._position:
+            return offset
+        last_block_end = self._last_block_start + len(self._last_block)
+        # Bytes between the last read's end and the current position are
+        # already back in the pending buffer
+        if not self._last_block_start <= offset <= last_block_end:
+            raise io.UnsupportedOperation("Can only rewind within the last read")
+
+        if offset < self._position:
+            self._pending[:0] = self._last_block[offset - self._last_block_start:self._position - self._last_block_start]
+        else:
+            del self._pending[:offset - self._position]
+        self._position = offset
+        return offset
+
+    def _fill(self, n: int) -> None:
+        while n < 0 or len(self._pending) < n:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                return
+            self.size += len(chunk)
+            self.md5.update(chunk)
+            self._pending += chunk
+
+    def read(self, n: Optional[int] = -1) -> bytes:
+        n = -1 if n is None else n
+        self._fill(n)
+        if n < 0:
+            n = len(self._pending)
+        block = bytes(self._pending[:n])
+        del self._pending[:n]
+
+        self._last_block = block
+        self._last_block_start = self._position
+        self._position += len(block)
+        return block
+
+    read1 = read
+
+    def readinto(self, b) -> int:
+        block = self.read(len(b))
+        b[:len(block)] = block
+        return len(block)
+
+    def exhausted(self) -> bool:
+        self._fill(1)
+        return not self._pending
+
+    @property
+    def md5_base64(self) -> str:
+        return base64.b64encode(self.md5.digest()).decode()
+
+
+class StorageBackend(ABC):
+    """
+    Where generated images are stored and how clients get to them.
+
+    Methods are blocking; async callers run them in a thread pool.
+    """
+
+    def connect(self) -> None:
+        """Set up clients and credentials up front, so a bad configuration fails at startup"""
+
+    @abstractmethod
+    def owns(self, uri: str) -> bool:
+        """Whether `uri` points into this backend"""
+
+    @abstractmethod
+    def put_stream(self, name: str, chunks: Iterator[bytes], size: Optional[int], content_type: str) -> str:
+        """
+        Store a chunk stream under `name`
+
+        Args:
+            size: Expected size in bytes, verified after storing, or None if unknown
+
+        Returns:
+            URI of the stored object
+
+        Raises:
+            ValueError: The stream was truncated or the stored object does not match
+        """
+
+    @abstractmethod
+    def sign_url(self, uri: str, expiration: int) -> Optional[str]:
+        """Get a URL that serves `uri` for `expiration` seconds"""
@@ -2,11 +2,21 @@ import subprocess
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Depends
-from app.routers import health, auth, tasks
+from app.routers import health, auth, tasks, files, metrics
+from app.core.config import settings
 from app.core.redis import get_redis
+from app.core.serialization import FastJSONResponse, use_serializer
+from app.core.db.session import AsyncSessionLocal, async_engine
+from app.core.metrics import TaskEventHubCollector
+from app.core.instrumentation import RequestLatencyMiddleware
+from app.services.outbox_relay import OutboxRelay
+from app.services.task_event_hub import TaskEventHub
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import REGISTRY
 
 load_dotenv()
+use_serializer(settings.JSON_SERIALIZER)
+
 app = FastAPI(
     title="Pet-Tee API",
     description="Backend for Pet-Tee image generation service",
@@ -14,6 +24,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=FastJSONResponse,
     swagger_ui_parameters={
         "defaultModelsExpandDepth": -1,  # Hide schemas section by default
         "deepLinking": True,  # Allow direct links to operations
@@ -29,6 +40,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the measured latency covers the whole middleware stack
+if settings.REQUEST_INSTRUMENTATION_ENABLED:
+    app.add_middleware(
+        RequestLatencyMiddleware,
+        slow_threshold=settings.SLOW_REQUEST_THRESHOLD,
+        sample_rate=settings.SLOW_REQUEST_SAMPLE_RATE,
+    )
+
 
 @app.on_event("startup")
 async def startup_db_client():
@@ -36,9 +55,41 @@ async def startup_db_client():
     redis_client = await get_redis()
     app.state.redis = redis_client
 
+    # One task event subscription per worker process, shared by all SSE clients
+    app.state.task_event_hub = TaskEventHub(
+        redis_client,
+        queue_size=settings.SSE_CLIENT_QUEUE_SIZE,
+        policy=settings.SSE_CLIENT_QUEUE_POLICY,
+    )
+    await app.state.task_event_hub.start()
+
+    if settings.METRICS_ENABLED:
+        app.state.task_event_hub_collector = TaskEventHubCollector(app.state.task_event_hub)
+        REGISTRY.register(app.state.task_event_hub_collector)
+
+    # Moves committed task IDs from the outbox into the Redis queue
+    if settings.OUTBOX_RELAY_ENABLED:
+        app.state.outbox_relay = OutboxRelay(
+            AsyncSessionLocal,
+            redis_client,
+            batch_size=settings.OUTBOX_RELAY_BATCH_SIZE,
+            interval=settings.OUTBOX_RELAY_INTERVAL,
+            engine=async_engine,
+        )
+        await app.state.outbox_relay.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if hasattr(app.state, "outbox_relay"):
+        await app.state.outbox_relay.stop()
+
+    if hasattr(app.state, "task_event_hub_collector"):
+        REGISTRY.unregister(app.state.task_event_hub_collector)
+
+    if hasattr(app.state, "task_event_hub"):
+        await app.state.task_event_hub.stop()
+
     # Close Redis connection on shutdown
     if hasattr(app.state, "redis"):
         await app.state.redis.close()
@@ -46,4 +97,11 @@ async def shutdown_db_client():
 
 app.include_router(health.router, tags=["health"])
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
-app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
\ No newline at end of file
+app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["metrics"])
+
+# Signed URLs of the local storage backend point here
+if settings.STORAGE_BACKEND == "local":
+    app.include_router(files.router, prefix="/files", tags=["files"])
@@ -1,4 +1,5 @@
 from .user import User
 from .task import Task, TaskStatus
+from .task_outbox import TaskOutbox
 
-__all__ = ["User", "Task", "TaskStatus"]
+__all__ = ["User", "Task", "TaskStatus", "TaskOutbox"]
@@ -1,7 +1,7 @@
 import enum
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Enum, ForeignKey, Text, DateTime
+from sqlalchemy import Column, String, Enum, ForeignKey, Text, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -29,3 +29,13 @@ class Task(Base):
 
     # Relationship
     user = relationship("User", back_populates="tasks")
+
+    __table_args__ = (
+        Index(
+            "ix_tasks_user_id_created_at",
+            user_id,
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=deleted_at.is_(None),
+        ),
+    )
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.db.session import Base
+
+
+class TaskOutbox(Base):
+    """
+    Task IDs waiting to be pushed to the Redis queue.
+
+    Rows are written in the same transaction as their task and deleted by the
+    outbox relay once the ID has been queued.
+    """
+    __tablename__ = "task_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
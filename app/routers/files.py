@@ -0,0 +1,33 @@
+import mimetypes
+import os
+
+import anyio
+from fastapi import APIRouter, HTTPException
+from starlette.responses import FileResponse
+
+from app.core.storage import LocalStorageBackend, get_storage_backend
+
+router = APIRouter()
+
+
+@router.get("/{name:path}")
+async def get_file(name: str, expires: int, signature: str):
+    """
+    Serve an object of the local storage backend through a signed URL
+
+    The file is streamed in chunks by Starlette's FileResponse, which reads
+    it in a worker thread, so large files do not block the event loop.
+    """
+    backend = get_storage_backend()
+    if not isinstance(backend, LocalStorageBackend):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if not backend.verify(name, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+
+    path = backend.path_for(name)
+    if path is None or not await anyio.to_thread.run_sync(os.path.isfile, path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    media_type, _ = mimetypes.guess_type(path)
+    return FileResponse(path, media_type=media_type or "application/octet-stream")
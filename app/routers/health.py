@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends
+from app.core.services import TaskEventHubDep
 from app.schemas.response import BaseResponse
 from app.utils.auth import get_current_user
 from app.models.user import User
@@ -7,4 +8,9 @@ router = APIRouter()
 
 @router.get("/ping", response_model=BaseResponse)
 async def ping():
-    return BaseResponse.success_response(data={"message": "PONG"})
\ No newline at end of file
+    return BaseResponse.success_response(data={"message": "PONG"})
+
+
+@router.get("/events/stats", response_model=BaseResponse)
+async def event_stats(task_event_hub: TaskEventHubDep):
+    return BaseResponse.success_response(data=task_event_hub.metrics())
@@ -0,0 +1,30 @@
+import redis.asyncio as redis
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.core.config import settings
+from app.core.metrics import QUEUE_DEPTH, QUEUE_SHARED_DEPTH, QUEUE_ACTIVE_USERS, CONSUMER_THROUGHPUT
+from app.core.redis import get_redis
+from app.services.task_queue import TaskQueue, LANES
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(redis_client: redis.Redis = Depends(get_redis)):
+    """
+    Prometheus metrics of this worker process, plus queue gauges read from Redis
+    """
+    task_queue = TaskQueue(redis_client)
+    try:
+        stats = await task_queue.stats()
+        QUEUE_DEPTH.set(stats["depth"])
+        QUEUE_SHARED_DEPTH.set(stats["shared"])
+        for lane in LANES:
+            QUEUE_ACTIVE_USERS.labels(lane).set(stats[f"active_users:{lane}"])
+        CONSUMER_THROUGHPUT.set(await task_queue.throughput(settings.THROUGHPUT_WINDOW))
+    except redis.RedisError:
+        # Serve the process metrics anyway; the queue gauges keep their last values
+        pass
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,14 +1,19 @@
-import asyncio
-import json
+from typing import List, Optional
 from uuid import UUID
 
-from asyncpg.pgproto.pgproto import timedelta
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from app.schemas.task import TaskCreate, APIResponse
-from app.models.user import User
-from app.core.services import TaskServiceDep
-from app.utils.auth import get_current_user
+from pydantic import ValidationError
+from app.schemas.task import TaskCreate, TaskBatchCreate, TaskSummary, APIResponse
+from app.models.task import TaskStatus
+from app.schemas.user import CurrentUser
+from app.core.config import settings
+from app.core.db.session import AsyncSessionLocal
+from app.core.services import TaskServiceDep, TaskEventHubDep, RateLimiterDep, AdmissionControllerDep
+from app.services.task_service import TaskService
+from app.services.task_events import get_task_list_version, get_events_since
+from app.utils.auth import get_token_user
+from app.utils.sse import sse_comment, sse_frame
 
 router = APIRouter()
 
@@ -16,17 +21,130 @@ router = APIRouter()
 async def create_task(
     task_data: TaskCreate,
     task_service: TaskServiceDep,
-    current_user: User = Depends(get_current_user)
+    rate_limiter: RateLimiterDep,
+    admission_controller: AdmissionControllerDep,
+    current_user: CurrentUser = Depends(get_token_user)
 ):
     """
     Create a new task and queue it for processing
+
+    The response includes the task's estimated `queue_position`,
+    `estimated_wait_seconds` and `estimated_start_at` (null while there is no
+    recent throughput to estimate from).
+
+    Returns 503 with Retry-After when the queue is too far behind, and 429
+    with Retry-After when the user or global creation rate limit is exceeded.
     """
+    estimate = await admission_controller.admit(current_user)
+    await rate_limiter.check_task_creation(current_user.id)
     task_id = await task_service.create_task(task_data, current_user.id)
 
+    data = {"task_id": task_id}
+    if estimate is not None:
+        data.update(estimate.to_dict())
+
+    return APIResponse(
+        success=True,
+        data=data
+    )
+
+
+@router.post("/batch", response_model=APIResponse)
+async def create_tasks_batch(
+    batch: TaskBatchCreate,
+    task_service: TaskServiceDep,
+    rate_limiter: RateLimiterDep,
+    admission_controller: AdmissionControllerDep,
+    current_user: CurrentUser = Depends(get_token_user)
+):
+    """
+    Create up to TASK_BATCH_MAX_SIZE tasks in one request and queue them for processing
+
+    Each item is validated on its own; `results` reports the created task ID
+    or the validation error for every item, in request order. Every valid
+    item counts against the creation rate limit; if they do not all fit,
+    the whole batch is rejected with 429. The batch is also subject to
+    admission control (503) and reports the queue estimate of its first task.
+    Batches with more than TASK_BATCH_MAX_SIZE items are rejected with 422.
+    """
+    results = []
+    valid_items = []
+    for index, item in enumerate(batch.items):
+        try:
+            valid_items.append((index, TaskCreate.model_validate(item)))
+        except ValidationError as e:
+            results.append({
+                "index": index,
+                "task_id": None,
+                "error": "; ".join(error["msg"] for error in e.errors())
+            })
+
+    estimate = None
+    if valid_items:
+        estimate = await admission_controller.admit(current_user, len(valid_items))
+        await rate_limiter.check_task_creation(current_user.id, len(valid_items))
+        task_ids = await task_service.create_tasks(
+            [task_data for _, task_data in valid_items],
+            current_user.id
+        )
+        for (index, _), task_id in zip(valid_items, task_ids):
+            results.append({"index": index, "task_id": task_id, "error": None})
+
+    results.sort(key=lambda result: result["index"])
+
+    data = {"results": results}
+    if estimate is not None:
+        data.update(estimate.to_dict())
+
+    return APIResponse(
+        success=True,
+        data=data
+    )
+
+
+async def task_list_item(task: dict, task_service: TaskService) -> dict:
+    image_url = None
+    if task["status"] == TaskStatus.DONE and task["image_uri"]:
+        image_url = await task_service.generate_signed_url(task["image_uri"])
+
+    return {
+        "id": task["id"],
+        "animal": task["animal"],
+        "text": task["text"],
+        "status": task["status"],
+        "image_uri": image_url,
+    }
+
+
+async def build_task_list(tasks: List[TaskSummary], task_service: TaskService) -> List[dict]:
+    # Sign all finished images in one batch; cached URLs are reused
+    image_urls = await task_service.generate_signed_urls(
+        task.image_uri for task in tasks
+        if task.status == TaskStatus.DONE and task.image_uri
+    )
+
+    return [task.to_dict(image_urls.get(task.image_uri)) for task in tasks]
+
+
+@router.get("/list", response_model=APIResponse)
+async def list_tasks(
+    task_service: TaskServiceDep,
+    current_user: CurrentUser = Depends(get_token_user),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.TASK_PAGE_SIZE_MAX),
+):
+    """
+    Get a page of the user's tasks, newest first
+
+    Pass the `next_cursor` of a page (or of the SSE snapshot) as `cursor` to get the following page.
+    """
+    tasks, next_cursor = await task_service.get_user_tasks(current_user.id, limit=limit, cursor=cursor)
+
     return APIResponse(
         success=True,
         data={
-            "task_id": task_id
+            "tasks": await build_task_list(tasks, task_service),
+            "next_cursor": next_cursor
         }
     )
 
@@ -38,7 +156,12 @@ async def create_task(
     description="""
     This endpoint uses **Server-Sent Events (SSE)** to stream the user's task list.
 
-    - Returns `data: {json}` every 5 second.
+    - Sends the newest `limit` tasks once as `data: {json}` on connect, with a `next_cursor` for `GET /tasks/list`.
+    - `image_uri` holds a signed URL for finished tasks.
+    - Afterwards sends a `task` event with the changed task whenever a task is created or changes status.
+    - Every frame carries the user's task list version as its event `id`.
+    - Reconnecting with `Last-Event-ID` replays only the missed changes, or nothing if the list is unchanged.
+    - Sends a `: heartbeat` comment when idle to keep the connection alive.
     - Media type: `text/event-stream`.
     - Recommended to test with curl or EventSource in browser.
     - Swagger UI does not support live SSE output.
@@ -46,31 +169,82 @@ async def create_task(
 )
 async def get_tasks(
     task_service: TaskServiceDep,
-    current_user: User = Depends(get_current_user),
+    task_event_hub: TaskEventHubDep,
+    current_user: CurrentUser = Depends(get_token_user),
+    limit: Optional[int] = Query(None, ge=1, le=settings.TASK_PAGE_SIZE_MAX),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
 ):
-    async def event_stream():
-        while True:
-            tasks = await task_service.get_user_tasks(current_user.id)
-
-            task_list = []
-            for task in tasks:
-                task_list.append({
-                    "id": str(task.id),
-                    "animal": task.animal,
-                    "text": task.text,
-                    "status": task.status,
-                    "image_uri": None,
-                })
-
-            response_data = {
-                "success": True,
-                "data": {
-                    "tasks": task_list
-                }
+    redis_client = task_service.redis_service.redis
+
+    async def snapshot(version: int):
+        # The request's session is already closed once the stream runs; reusing
+        # it would hold a pooled connection idle in a transaction for the life
+        # of the stream, so each snapshot gets its own short-lived session.
+        async with AsyncSessionLocal() as session:
+            snapshot_service = TaskService(session, task_service.redis_service)
+            tasks, next_cursor = await snapshot_service.get_user_tasks(current_user.id, limit=limit)
+
+        response_data = {
+            "success": True,
+            "data": {
+                "tasks": await build_task_list(tasks, task_service),
+                "next_cursor": next_cursor
             }
+        }
+
+        return sse_frame(response_data, id=version)
+
+    async def task_frame(event: dict):
+        response_data = {
+            "success": True,
+            "data": {
+                "task": await task_list_item(event["task"], task_service)
+            }
+        }
+        return sse_frame(response_data, event="task", id=event["version"])
+
+    async def event_stream():
+        # Subscribe before reading the version so no transition is missed in between
+        async with task_event_hub.subscribe(current_user.id) as subscription:
+            last_sent = await get_task_list_version(redis_client, current_user.id)
+
+            resumed_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+            missed = None
+            if resumed_from is not None and resumed_from <= last_sent:
+                missed = await get_events_since(redis_client, current_user.id, resumed_from)
+
+            if missed is None:
+                yield await snapshot(last_sent)
+            else:
+                for event in missed:
+                    last_sent = max(last_sent, event["version"])
+                    yield await task_frame(event)
+
+            while True:
+                events = await subscription.get(timeout=settings.SSE_HEARTBEAT_INTERVAL)
+
+                if events is None:
+                    # Catch transitions whose pub/sub message never reached us
+                    version = await get_task_list_version(redis_client, current_user.id)
+                    if version > last_sent:
+                        last_sent = version
+                        yield await snapshot(version)
+                    else:
+                        yield sse_comment("heartbeat")
+                    continue
+
+                # Events were dropped for this client, resend the full list
+                if subscription.needs_resync:
+                    subscription.needs_resync = False
+                    last_sent = await get_task_list_version(redis_client, current_user.id)
+                    yield await snapshot(last_sent)
+                    continue
 
-            yield f"data: {json.dumps(response_data)}\n\n"
-            await asyncio.sleep(5)  # Wait 5 second before re-fetching
+                for event in sorted(events, key=lambda e: e["version"]):
+                    if event["version"] <= last_sent:
+                        continue
+                    last_sent = event["version"]
+                    yield await task_frame(event)
 
     return StreamingResponse(
         event_stream(),
@@ -82,7 +256,7 @@ async def get_tasks(
 async def get_task_by_id(
     id: UUID,
     task_service: TaskServiceDep,
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_token_user)
 ):
     """
     Get a single task by ID with a signed URL for the image
@@ -96,7 +270,7 @@ async def get_task_by_id(
     # Generate signed URL for image if available
     image_url = None
     if task.image_uri:
-        image_url = task_service.generate_signed_url(task.image_uri)
+        image_url = await task_service.generate_signed_url(task.image_uri)
 
     return APIResponse(
         success=True,
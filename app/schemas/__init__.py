@@ -1,3 +1,3 @@
-from .user import UserCreate, UserResponse, UserLogin, UserInDB
+from .user import UserCreate, UserResponse, UserLogin, UserInDB, CurrentUser
 
-__all__ = ["UserCreate", "UserResponse", "UserLogin", "UserInDB"]
+__all__ = ["UserCreate", "UserResponse", "UserLogin", "UserInDB", "CurrentUser"]
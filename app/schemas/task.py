@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 from pydantic import BaseModel, Field, validator
+from app.core.config import settings
 from app.models.task import TaskStatus
 
 
@@ -27,6 +28,12 @@ class TaskResponse(TaskBase):
         orm_mode = True
 
 
+class TaskBatchCreate(BaseModel):
+    # Items are validated one by one so invalid ones can be reported per item;
+    # only the count is checked here, so oversized batches are rejected early
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=settings.TASK_BATCH_MAX_SIZE)
+
+
 class TaskCreateResponse(BaseModel):
     task_id: UUID
 
@@ -35,6 +42,35 @@ class TaskListResponse(BaseModel):
     tasks: List[TaskResponse]
 
 
+class TaskSummary:
+    """
+    Compact read model for task listings, built from a column-projected row
+    instead of a full ORM object.
+    """
+    __slots__ = ("id", "animal", "text", "status", "image_uri", "created_at")
+
+    # Column order expected by the constructor
+    columns = __slots__
+
+    def __init__(self, id, animal, text, status, image_uri, created_at):
+        self.id = id
+        self.animal = animal
+        self.text = text
+        self.status = status
+        self.image_uri = image_uri
+        self.created_at = created_at
+
+    def to_dict(self, image_url: Optional[str] = None) -> dict:
+        # id and status stay native; app.core.serialization encodes them
+        return {
+            "id": self.id,
+            "animal": self.animal,
+            "text": self.text,
+            "status": self.status,
+            "image_uri": image_url,
+        }
+
+
 class APIResponse(BaseModel):
     success: bool = True
     errors: List[str] = []
@@ -35,3 +35,9 @@ class UserResponse(UserBase):
 
 class UserResponseData(BaseResponse[UserResponse]):
     pass
+
+
+class CurrentUser(BaseModel):
+    id: uuid.UUID
+    username: str
+    role: UserRole
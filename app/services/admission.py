@@ -0,0 +1,107 @@
+import datetime
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import redis.asyncio as redis
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.schemas.user import CurrentUser
+from app.services.redis_service import RedisService
+from app.services.task_queue import TaskQueue, lane_for_role, LANE_PRIORITY
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueueEstimate:
+    queue_depth: int
+    # 1-based position of the first new task in consumption order
+    queue_position: int
+    # Tasks finished per second by all consumers, 0 when unknown
+    throughput: float
+
+    @property
+    def estimated_wait(self) -> Optional[float]:
+        """Seconds until the first new task starts, None without throughput data"""
+        if self.queue_position <= 1:
+            return 0.0
+        if self.throughput <= 0:
+            return None
+        return (self.queue_position - 1) / self.throughput
+
+    def to_dict(self) -> Dict[str, Any]:
+        wait = self.estimated_wait
+        start_at = None
+        if wait is not None:
+            start_at = (datetime.datetime.utcnow() + datetime.timedelta(seconds=wait)).isoformat() + "Z"
+        return {
+            "queue_position": self.queue_position,
+            "estimated_wait_seconds": round(wait, 1) if wait is not None else None,
+            "estimated_start_at": start_at,
+        }
+
+
+class AdmissionController:
+    """
+    Backpressure on task creation from the queue depth and the recent
+    consumer throughput, both read from Redis.
+    """
+
+    def __init__(self, redis_service: RedisService):
+        self.task_queue = TaskQueue(redis_service.redis)
+
+    async def estimate(self, user: CurrentUser) -> QueueEstimate:
+        depth, ahead = await self.task_queue.estimate(user.id, lane_for_role(user.role))
+        throughput = await self.task_queue.throughput(settings.THROUGHPUT_WINDOW)
+        return QueueEstimate(queue_depth=depth, queue_position=ahead + 1, throughput=throughput)
+
+    def retry_after(self, estimate: QueueEstimate, excess: int) -> int:
+        # Time for the consumers to work off the excess, bounded
+        if estimate.throughput <= 0:
+            return settings.ADMISSION_RETRY_AFTER_MAX
+        return max(1, min(settings.ADMISSION_RETRY_AFTER_MAX, math.ceil(excess / estimate.throughput)))
+
+    async def admit(self, user: CurrentUser, count: int = 1) -> Optional[QueueEstimate]:
+        """
+        Check whether `count` new tasks of the user can be queued
+
+        The priority lane is only subject to the wait limit, since it is
+        served ahead of the backlog.
+
+        Returns:
+            Queue estimate for the first new task, None if unavailable
+
+        Raises:
+            HTTPException: 503 with Retry-After when the queue is too far behind
+        """
+        if not settings.ADMISSION_CONTROL_ENABLED or count <= 0:
+            return None
+
+        try:
+            estimate = await self.estimate(user)
+        except redis.RedisError as e:
+            # Fail open: without Redis the relay queues tasks later anyway
+            logger.error(f"Admission check failed: {str(e)}")
+            return None
+
+        excess = estimate.queue_depth + count - settings.ADMISSION_MAX_QUEUE_DEPTH
+        if excess > 0 and lane_for_role(user.role) != LANE_PRIORITY:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Task queue is full, please retry later",
+                headers={"Retry-After": str(self.retry_after(estimate, excess))},
+            )
+
+        wait = estimate.estimated_wait
+        if settings.ADMISSION_MAX_WAIT is not None and wait is not None and wait > settings.ADMISSION_MAX_WAIT:
+            excess = math.ceil((wait - settings.ADMISSION_MAX_WAIT) * estimate.throughput)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Estimated wait of {int(wait)}s exceeds the limit, please retry later",
+                headers={"Retry-After": str(self.retry_after(estimate, excess))},
+            )
+
+        return estimate
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserResponse
-from app.utils.auth import get_password_hash, verify_password, create_access_token
+from app.utils.auth import get_password_hash_async, verify_password_async, create_access_token
 
 
 class AuthService:
@@ -25,7 +25,7 @@ class AuthService:
                 detail="Username already registered"
             )
 
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         new_user = User(
             username=user_data.username,
             hashed_password=hashed_password,
@@ -43,7 +43,7 @@ class AuthService:
             select(User)
             .where(User.username == username)
         )
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
@@ -52,7 +52,8 @@ class AuthService:
         access_token = create_access_token(
             data={
                 "sub": user.username,
-                "id": str(user.id)
+                "id": str(user.id),
+                "role": user.role.value
             },
             expires_delta=access_token_expires
         )
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+import redis.asyncio as redis
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.models.task import Task
+from app.models.task_outbox import TaskOutbox
+from app.models.user import User
+from app.services.task_queue import TaskQueue, lane_for_role
+
+logger = logging.getLogger(__name__)
+
+# Notified by a trigger on task_outbox when an insert commits
+OUTBOX_CHANNEL = "task_outbox"
+
+
+class OutboxRelay:
+    """
+    Drains the task outbox into the Redis queue in batches.
+
+    Each ID goes to its owner's sub-queue, in the lane of the owner's role.
+
+    Rows are locked with SKIP LOCKED, so any number of relays can run side by
+    side. Rows are deleted only after the push succeeded; a crash in between
+    queues those IDs again, which the consumer tolerates.
+
+    With an `engine`, one connection LISTENs on the outbox channel and wakes
+    the relay as soon as new entries commit; `interval` is then only a
+    fallback poll for missed notifications. Without one the relay polls.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        redis_client: redis.Redis,
+        batch_size: int,
+        interval: float,
+        engine: Optional[AsyncEngine] = None,
+    ):
+        self.session_factory = session_factory
+        self.task_queue = TaskQueue(redis_client)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.engine = engine
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks.append(asyncio.create_task(self._run()))
+        if self.engine is not None:
+            self._tasks.append(asyncio.create_task(self._listen()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake the relay for new outbox entries"""
+        self._wakeup.set()
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        self.notify()
+
+    async def relay_once(self) -> int:
+        """
+        Push one batch of outbox entries to the queue
+
+        Returns:
+            Number of relayed task IDs
+        """
+        async with self.session_factory() as session:
+            rows = (await session.execute(
+                select(TaskOutbox.id, TaskOutbox.task_id, Task.user_id, User.role)
+                .join(Task, Task.id == TaskOutbox.task_id)
+                .join(User, User.id == Task.user_id)
+                .order_by(TaskOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(of=TaskOutbox, skip_locked=True)
+            )).all()
+            if not rows:
+                await session.rollback()
+                return 0
+
+            await self.task_queue.push_fair(
+                (row.task_id, row.user_id, lane_for_role(row.role)) for row in rows
+            )
+
+            await session.execute(
+                delete(TaskOutbox).where(TaskOutbox.id.in_([row.id for row in rows]))
+            )
+            await session.commit()
+            return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            # Cleared first, so a notification during the batch is not lost
+            self._wakeup.clear()
+            try:
+                relayed = await self.relay_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox relay failed: {str(e)}")
+                relayed = 0
+
+            # A full batch means more is probably waiting
+            if relayed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                # Held for the relay's lifetime; asyncpg runs LISTEN outside a transaction
+                async with self.engine.connect() as connection:
+                    raw_connection = await connection.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    closed = asyncio.Event()
+                    driver_connection.add_termination_listener(lambda _: closed.set())
+                    await driver_connection.add_listener(OUTBOX_CHANNEL, self._on_notification)
+                    try:
+                        # Entries committed before LISTEN took effect
+                        self.notify()
+                        await closed.wait()
+                        logger.warning("Outbox listener connection closed, reconnecting")
+                    finally:
+                        if not driver_connection.is_closed():
+                            await driver_connection.remove_listener(OUTBOX_CHANNEL, self._on_notification)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox listener failed: {str(e)}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,136 @@
+import logging
+import math
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+import redis.asyncio as redis
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.services.redis_service import RedisService
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_PREFIX = "rate_limit"
+
+# Sliding-window log over one sorted set per limit, scored by milliseconds.
+# All windows are trimmed and checked first and the request is recorded in
+# all of them only if every one has room, so a denied request consumes
+# nothing. `cost` units are added as separate members.
+#
+# KEYS: one sorted set per limit
+# ARGV: window_ms, cost, member_prefix, limit for each key in order
+# Returns {index of the first exceeded key (0 if allowed), retry after ms}
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local window = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i + 3])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local used = redis.call('ZCOUNT', key, now - window + 1, '+inf')
+    if used + cost > limit then
+        if cost > limit then
+            return {i, window}
+        end
+        -- Wait until enough of the oldest entries have left the window
+        local oldest = redis.call('ZRANGE', key, used + cost - limit - 1, used + cost - limit - 1, 'WITHSCORES')
+        return {i, tonumber(oldest[2]) + window - now}
+    end
+end
+
+for _, key in ipairs(KEYS) do
+    for n = 1, cost do
+        redis.call('ZADD', key, now, ARGV[3] .. ':' .. n)
+    end
+    redis.call('PEXPIRE', key, window)
+end
+return {0, 0}
+"""
+
+
+@dataclass
+class RateLimit:
+    key: str
+    limit: int
+    scope: str
+
+
+class RateLimiter:
+    """
+    Sliding-window limits on task creation, per user and across all users,
+    evaluated atomically in Redis in one round-trip.
+    """
+
+    def __init__(self, redis_service: RedisService):
+        self.redis_service = redis_service
+
+    @staticmethod
+    def task_limits(user_id: UUID) -> List[RateLimit]:
+        return [
+            RateLimit(f"{RATE_LIMIT_PREFIX}:tasks:user:{user_id}", settings.RATE_LIMIT_USER_MAX_TASKS, "user"),
+            RateLimit(f"{RATE_LIMIT_PREFIX}:tasks:global", settings.RATE_LIMIT_GLOBAL_MAX_TASKS, "global"),
+        ]
+
+    async def hit(self, limits: List[RateLimit], cost: int = 1) -> Optional[Tuple[RateLimit, int]]:
+        """
+        Record `cost` units against every limit if all of them have room
+
+        Returns:
+            None if allowed, else (exceeded limit, seconds until it has room)
+        """
+        exceeded, retry_after_ms = await self.redis_service.run_script(
+            SLIDING_WINDOW_SCRIPT,
+            keys=[limit.key for limit in limits],
+            args=[
+                int(settings.RATE_LIMIT_WINDOW * 1000),
+                cost,
+                uuid.uuid4().hex,
+                *(limit.limit for limit in limits),
+            ],
+        )
+        if not exceeded:
+            return None
+        return limits[exceeded - 1], max(1, math.ceil(int(retry_after_ms) / 1000))
+
+    async def check_task_creation(self, user_id: UUID, count: int = 1) -> None:
+        """
+        Count `count` task creations against the user's and the global limit
+
+        Raises:
+            HTTPException: 400 when `count` exceeds a limit outright, so no
+                retry could succeed; 429 with Retry-After when a limit is
+                exceeded for now
+        """
+        if not settings.RATE_LIMIT_ENABLED or count <= 0:
+            return
+
+        max_count = min(limit.limit for limit in self.task_limits(user_id))
+        if count > max_count:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {max_count} tasks can be created per {int(settings.RATE_LIMIT_WINDOW)} seconds"
+            )
+
+        try:
+            denied = await self.hit(self.task_limits(user_id), count)
+        except redis.RedisError as e:
+            # Fail open: Redis trouble should not block task creation
+            logger.error(f"Rate limit check failed: {str(e)}")
+            return
+
+        if denied is not None:
+            limit, retry_after = denied
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=(
+                    "Too many tasks created, please retry later"
+                    if limit.scope == "user"
+                    else "Task creation is temporarily throttled, please retry later"
+                ),
+                headers={"Retry-After": str(retry_after)},
+            )
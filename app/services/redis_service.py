@@ -43,3 +43,7 @@ class RedisService:
         if value is None:
             return None
         return json.loads(value)
+
+    async def run_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        # EVALSHA with a fallback to EVAL when the script is not cached yet
+        return await self.redis.register_script(script)(keys=keys, args=args)
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import redis.asyncio as redis
+from cachetools import LRUCache
+
+from app.core.config import settings
+from app.core.instrumentation import timed
+from app.core.storage import get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+
+class SignedUrlCache:
+    """
+    Caches signed URLs per image URI until shortly before they expire.
+
+    Signing goes through the configured storage backend in a worker thread.
+
+    Lookups go to an in-memory LRU first and then, if enabled, to Redis so
+    that all workers share signatures. Concurrent misses for the same URI
+    wait on a single signing call, and at most `sign_concurrency` signing
+    calls run at once. A URI that cannot be signed yields None instead of
+    failing the caller, and Redis errors only bypass the shared tier.
+    """
+
+    def __init__(self, maxsize: int, refresh_margin: int, sign_concurrency: int = 16):
+        self.refresh_margin = refresh_margin
+        self.sign_slots = asyncio.Semaphore(sign_concurrency)
+        # (image_uri, expiration) -> (url, unix time after which it must be re-signed)
+        self.memory: LRUCache = LRUCache(maxsize=maxsize)
+        self.pending: Dict[Tuple[str, int], asyncio.Future] = {}
+
+    @staticmethod
+    def _redis_key(image_uri: str, expiration: int) -> str:
+        digest = hashlib.sha1(image_uri.encode()).hexdigest()
+        return f"signed_url:{expiration}:{digest}"
+
+    def get_cached(self, image_uri: str, expiration: int) -> Optional[str]:
+        entry = self.memory.get((image_uri, expiration))
+        if entry is None:
+            return None
+
+        url, refresh_at = entry
+        if time.time() >= refresh_at:
+            return None
+        return url
+
+    async def get(self, image_uri: str, expiration: int, redis_client: Optional[redis.Redis] = None) -> Optional[str]:
+        if not get_storage_backend().owns(image_uri):
+            return None
+
+        url = self.get_cached(image_uri, expiration)
+        if url is not None:
+            return url
+
+        return await self._get_or_none(image_uri, expiration, redis_client, lookup_redis=True)
+
+    async def get_many(self, image_uris: Iterable[str], expiration: int, redis_client: Optional[redis.Redis] = None) -> Dict[str, Optional[str]]:
+        """
+        Get signed URLs for several objects, signing only the cache misses
+
+        Returns:
+            Mapping of image URI to signed URL; URIs that are invalid or
+            could not be signed map to None or are left out
+        """
+        urls = {}
+        misses = []
+        for image_uri in set(image_uris):
+            if not get_storage_backend().owns(image_uri):
+                continue
+            url = self.get_cached(image_uri, expiration)
+            if url is None:
+                misses.append(image_uri)
+            else:
+                urls[image_uri] = url
+
+        if not misses:
+            return urls
+
+        # One MGET for every memory miss instead of a GET per object
+        if redis_client is not None:
+            now = time.time()
+            try:
+                cached_values = await redis_client.mget([self._redis_key(uri, expiration) for uri in misses])
+            except redis.RedisError as e:
+                logger.error(f"Signed URL cache lookup failed: {str(e)}")
+                cached_values = [None] * len(misses)
+            remaining = []
+            for image_uri, cached in zip(misses, cached_values):
+                cached = json.loads(cached) if cached is not None else None
+                if cached is not None and now < cached["refresh_at"]:
+                    self.memory[(image_uri, expiration)] = (cached["url"], cached["refresh_at"])
+                    urls[image_uri] = cached["url"]
+                else:
+                    remaining.append(image_uri)
+            misses = remaining
+
+        signed = await asyncio.gather(*(
+            self._get_or_none(image_uri, expiration, redis_client, lookup_redis=False) for image_uri in misses
+        ))
+        urls.update(zip(misses, signed))
+        return urls
+
+    async def _get_or_none(self, image_uri: str, expiration: int, redis_client: Optional[redis.Redis], lookup_redis: bool) -> Optional[str]:
+        # One unsignable image must not fail a whole list or SSE stream
+        try:
+            return await self._get(image_uri, expiration, redis_client, lookup_redis)
+        except Exception as e:
+            logger.error(f"Failed to sign URL for {image_uri}: {str(e)}")
+            return None
+
+    async def _get(self, image_uri: str, expiration: int, redis_client: Optional[redis.Redis], lookup_redis: bool) -> str:
+        key = (image_uri, expiration)
+        pending = self.pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            url, refresh_at = await self._load(image_uri, expiration, redis_client, lookup_redis)
+            self.memory[key] = (url, refresh_at)
+            future.set_result(url)
+            return url
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody waited on is not logged
+            future.exception()
+            raise
+        finally:
+            del self.pending[key]
+
+    async def _load(self, image_uri: str, expiration: int, redis_client: Optional[redis.Redis], lookup_redis: bool) -> Tuple[str, float]:
+        redis_key = self._redis_key(image_uri, expiration)
+
+        if redis_client is not None and lookup_redis:
+            try:
+                cached = await redis_client.get(redis_key)
+            except redis.RedisError as e:
+                logger.error(f"Signed URL cache lookup failed: {str(e)}")
+                cached = None
+            if cached is not None:
+                cached = json.loads(cached)
+                if time.time() < cached["refresh_at"]:
+                    return cached["url"], cached["refresh_at"]
+
+        async with self.sign_slots:
+            with timed("signing"):
+                url = await asyncio.to_thread(get_storage_backend().sign_url, image_uri, expiration)
+        ttl = max(expiration - self.refresh_margin, 1)
+        refresh_at = time.time() + ttl
+
+        if redis_client is not None:
+            try:
+                await redis_client.set(redis_key, json.dumps({"url": url, "refresh_at": refresh_at}), ex=ttl)
+            except redis.RedisError as e:
+                logger.error(f"Signed URL cache store failed: {str(e)}")
+
+        return url, refresh_at
+
+
+signed_url_cache = SignedUrlCache(
+    maxsize=settings.SIGNED_URL_CACHE_SIZE,
+    refresh_margin=settings.SIGNED_URL_REFRESH_MARGIN,
+    sign_concurrency=settings.SIGNED_URL_SIGN_CONCURRENCY,
+)
@@ -0,0 +1,169 @@
+import asyncio
+import itertools
+import json
+import logging
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from uuid import UUID
+
+import redis.asyncio as redis
+
+from app.services.task_events import CHANNEL_PREFIX
+
+logger = logging.getLogger(__name__)
+
+POLICY_COALESCE = "coalesce"
+POLICY_DROP_OLDEST = "drop_oldest"
+
+
+class TaskEventSubscription:
+    """
+    Bounded per-connection buffer of task events.
+
+    With the coalesce policy a newer event for a task replaces the queued one,
+    so a slow client only ever sees the latest state. Once the buffer is full
+    the oldest event is dropped and the subscription is flagged for a resync.
+    """
+
+    def __init__(self, hub: "TaskEventHub", user_id: str, maxsize: int, policy: str):
+        self.hub = hub
+        self.user_id = user_id
+        self.maxsize = maxsize
+        self.policy = policy
+        self.buffer: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self.needs_resync = False
+        self._ready = asyncio.Event()
+        self._seq = itertools.count()
+
+    def put(self, event: Dict[str, Any]) -> None:
+        key = event["task"]["id"] if self.policy == POLICY_COALESCE else next(self._seq)
+        if key in self.buffer:
+            self.buffer[key] = event
+        else:
+            if len(self.buffer) >= self.maxsize:
+                self.buffer.popitem(last=False)
+                self.hub.dropped_events += 1
+                self.needs_resync = True
+            self.buffer[key] = event
+        self._ready.set()
+
+    def request_resync(self) -> None:
+        self.needs_resync = True
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """
+        Wait for events and return everything buffered
+
+        Returns:
+            List of events, or None if nothing arrived within the timeout
+        """
+        if not self._ready.is_set():
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        events = list(self.buffer.values())
+        self.buffer.clear()
+        self._ready.clear()
+        return events
+
+
+class TaskEventHub:
+    """
+    Process-wide fan-out of task events.
+
+    Holds a single pattern subscription on the task event channels and routes
+    each event to the subscriptions of its owner, so the number of Redis
+    connections does not grow with the number of SSE clients.
+    """
+
+    def __init__(self, redis_client: redis.Redis, queue_size: int, policy: str = POLICY_COALESCE):
+        self.redis = redis_client
+        self.queue_size = queue_size
+        self.policy = policy
+        self.subscribers: Dict[str, Set[TaskEventSubscription]] = defaultdict(set)
+        self.dropped_events = 0
+        self.delivered_events = 0
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                await self._pubsub.psubscribe(f"{CHANNEL_PREFIX}:*")
+                async for message in self._pubsub.listen():
+                    self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Task event subscription failed: {str(e)}")
+                # Events may have been missed while disconnected
+                for subscriptions in self.subscribers.values():
+                    for subscription in subscriptions:
+                        subscription.request_resync()
+                await asyncio.sleep(1)
+            finally:
+                if self._pubsub is not None:
+                    try:
+                        await self._pubsub.aclose()
+                    except Exception:
+                        pass
+                    self._pubsub = None
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        if message.get("type") != "pmessage":
+            return
+
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        user_id = channel[len(CHANNEL_PREFIX) + 1:]
+
+        subscriptions = self.subscribers.get(user_id)
+        if not subscriptions:
+            return
+
+        try:
+            event = json.loads(message["data"])
+        except (TypeError, ValueError):
+            logger.error(f"Malformed task event on {channel}")
+            return
+
+        for subscription in subscriptions:
+            subscription.put(event)
+            self.delivered_events += 1
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: UUID) -> AsyncIterator[TaskEventSubscription]:
+        key = str(user_id)
+        subscription = TaskEventSubscription(self, key, self.queue_size, self.policy)
+        self.subscribers[key].add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscriptions = self.subscribers.get(key)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscribers[key]
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "connected_clients": sum(len(s) for s in self.subscribers.values()),
+            "subscribed_users": len(self.subscribers),
+            "delivered_events": self.delivered_events,
+            "dropped_events": self.dropped_events,
+        }
@@ -0,0 +1,88 @@
+import json
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import redis.asyncio as redis
+
+from app.models.task import Task
+
+CHANNEL_PREFIX = "task_events"
+VERSION_PREFIX = "task_list_version"
+LOG_PREFIX = "task_events_log"
+
+# Recent events kept per user so reconnecting clients can replay them
+EVENT_LOG_SIZE = 100
+EVENT_LOG_TTL = 24 * 60 * 60
+
+# Bumps the owner's task list version, then publishes and logs the event
+# tagged with the new version, all in a single round-trip.
+PUBLISH_SCRIPT = """
+local version = redis.call('INCR', KEYS[1])
+local message = '{"version":' .. version .. ',"task":' .. ARGV[2] .. '}'
+redis.call('PUBLISH', ARGV[1], message)
+redis.call('LPUSH', KEYS[2], message)
+redis.call('LTRIM', KEYS[2], 0, tonumber(ARGV[3]) - 1)
+redis.call('EXPIRE', KEYS[2], tonumber(ARGV[4]))
+return version
+"""
+
+
+def task_events_channel(user_id: UUID) -> str:
+    return f"{CHANNEL_PREFIX}:{user_id}"
+
+
+def task_list_version_key(user_id: UUID) -> str:
+    return f"{VERSION_PREFIX}:{user_id}"
+
+
+def task_events_log_key(user_id: UUID) -> str:
+    return f"{LOG_PREFIX}:{user_id}"
+
+
+def task_event_payload(task: Task) -> Dict[str, Any]:
+    return {
+        "id": str(task.id),
+        "user_id": str(task.user_id),
+        "animal": task.animal,
+        "text": task.text,
+        "status": task.status.value,
+        "image_uri": task.image_uri,
+    }
+
+
+async def publish_task_event(redis_client: redis.Redis, task: Task) -> int:
+    """
+    Publish a task status transition to the owner's channel
+
+    Returns:
+        The owner's new task list version
+    """
+    script = redis_client.register_script(PUBLISH_SCRIPT)
+    return await script(
+        keys=[task_list_version_key(task.user_id), task_events_log_key(task.user_id)],
+        args=[
+            task_events_channel(task.user_id),
+            json.dumps(task_event_payload(task)),
+            EVENT_LOG_SIZE,
+            EVENT_LOG_TTL,
+        ],
+    )
+
+
+async def get_task_list_version(redis_client: redis.Redis, user_id: UUID) -> int:
+    version = await redis_client.get(task_list_version_key(user_id))
+    return int(version) if version is not None else 0
+
+
+async def get_events_since(redis_client: redis.Redis, user_id: UUID, version: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get the logged events newer than `version`, oldest first
+
+    Returns:
+        List of events, or None if the log no longer covers `version`
+    """
+    raw_events = await redis_client.lrange(task_events_log_key(user_id), 0, -1)
+    events = sorted((json.loads(raw) for raw in raw_events), key=lambda e: e["version"])
+    if not events or events[0]["version"] > version + 1:
+        return None
+    return [event for event in events if event["version"] > version]
@@ -0,0 +1,303 @@
+import json
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.models.user import UserRole
+
+# Lanes in strict priority order; within a lane users are served round-robin
+LANE_PRIORITY = "priority"
+LANE_DEFAULT = "default"
+LANES = (LANE_PRIORITY, LANE_DEFAULT)
+
+# Queues a user's task IDs and, if the user had nothing queued, appends the
+# user to the lane's round-robin ring. One signal token is pushed per task
+# to wake a blocked consumer.
+#
+# KEYS: user queue, lane ring, signal list
+# ARGV: user ID, task IDs...
+ENQUEUE_SCRIPT = """
+local was_empty = redis.call('LLEN', KEYS[1]) == 0
+for i = 2, #ARGV do
+    redis.call('LPUSH', KEYS[1], ARGV[i])
+    redis.call('LPUSH', KEYS[3], 1)
+end
+if was_empty then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+return #ARGV - 1
+"""
+
+# Takes the next task: first from the shared queue (requeued and legacy
+# entries), then from the first lane with work, where the user at the head
+# of the ring gives up one task and goes to the back if more are left.
+# A user stays in the ring exactly as long as their queue is non-empty.
+#
+# KEYS: shared queue, signal list, lane rings in priority order, then the
+#       processing list in reliable mode
+# ARGV: whether to consume a signal token (1/0), whether a processing list
+#       is given (1/0)
+DEQUEUE_SCRIPT = """
+local last_ring = #KEYS
+if ARGV[2] == '1' then
+    last_ring = #KEYS - 1
+end
+
+local function take(task)
+    if ARGV[1] == '1' then
+        redis.call('RPOP', KEYS[2])
+    end
+    if ARGV[2] == '1' then
+        redis.call('LPUSH', KEYS[#KEYS], task)
+    end
+    return task
+end
+
+local task = redis.call('RPOP', KEYS[1])
+if task then
+    return take(task)
+end
+
+for i = 3, last_ring do
+    local ring = KEYS[i]
+    for _ = 1, redis.call('LLEN', ring) do
+        local user = redis.call('LPOP', ring)
+        local queue = ring .. ':' .. user
+        task = redis.call('RPOP', queue)
+        if redis.call('LLEN', queue) > 0 then
+            redis.call('RPUSH', ring, user)
+        end
+        if task then
+            return take(task)
+        end
+    end
+end
+return false
+"""
+
+# Estimates how many queued tasks start before a new task of the user:
+# everything in the shared queue and in higher lanes, the user's own queue,
+# and in the user's lane up to as many tasks per other user as the new task
+# needs round-robin turns.
+#
+# KEYS: shared queue, signal list, user queue, lane rings in priority order
+# ARGV: 1-based index of the user's lane
+# Returns {total queued, tasks ahead}
+ESTIMATE_SCRIPT = """
+local ahead = redis.call('LLEN', KEYS[1])
+local turns = redis.call('LLEN', KEYS[3]) + 1
+local lane = tonumber(ARGV[1])
+for i = 1, lane do
+    local ring = KEYS[3 + i]
+    for _, user in ipairs(redis.call('LRANGE', ring, 0, -1)) do
+        local queue = ring .. ':' .. user
+        local queued = redis.call('LLEN', queue)
+        if i < lane then
+            ahead = ahead + queued
+        elseif queue ~= KEYS[3] then
+            ahead = ahead + math.min(queued, turns)
+        end
+    end
+end
+return {redis.call('LLEN', KEYS[2]), ahead + turns - 1}
+"""
+
+
+def lane_for_role(role: Optional[UserRole]) -> str:
+    return LANE_PRIORITY if role == UserRole.ADMIN else LANE_DEFAULT
+
+
+class TaskQueue:
+    """
+    Redis backed queue of task IDs with per-user fairness.
+
+    Every user has their own sub-queue inside a lane. Consumers serve the
+    lanes in priority order and, within a lane, take one task per user in
+    round-robin order, so a user with a large backlog only delays others by
+    one task per turn. The scheduling state lives in Redis and is updated by
+    Lua scripts, so any number of consumers share it.
+
+    The plain queue list is served before the lanes and holds requeued and
+    legacy entries. Consumers block on a signal list that receives one token
+    per queued task.
+
+    In reliable mode a popped ID is atomically moved into a per-worker
+    processing list and only removed once the worker acknowledges it, so
+    tasks held by a crashed worker can be requeued by the reaper.
+
+    The scripts derive user sub-queue keys from the ring they pop from, so
+    those keys cannot be declared up front. All derived keys therefore carry
+    the `{name}` hash tag, which puts them in the slot of the shared queue
+    and keeps the scripts valid on Redis Cluster.
+    """
+
+    def __init__(self, redis_client: redis.Redis, name: str = None):
+        self.redis = redis_client
+        self.name = name or settings.TASK_QUEUE_NAME
+        # A tagged key hashes like the bare shared queue name
+        self.prefix = f"{{{self.name}}}"
+        self.workers_key = f"{self.prefix}:workers"
+        self.signal_key = f"{self.prefix}:signal"
+        self.completions_key = f"{self.prefix}:completions"
+        self.enqueue_script = redis_client.register_script(ENQUEUE_SCRIPT)
+        self.dequeue_script = redis_client.register_script(DEQUEUE_SCRIPT)
+        self.estimate_script = redis_client.register_script(ESTIMATE_SCRIPT)
+
+    def lane_key(self, lane: str) -> str:
+        return f"{self.prefix}:lane:{lane}"
+
+    def user_queue_key(self, lane: str, user_id: UUID) -> str:
+        # Must match `ring .. ':' .. user` in DEQUEUE_SCRIPT
+        return f"{self.lane_key(lane)}:{user_id}"
+
+    def processing_key(self, worker_id: str) -> str:
+        return f"{self.prefix}:processing:{worker_id}"
+
+    def heartbeat_key(self, worker_id: str) -> str:
+        return f"{self.prefix}:heartbeat:{worker_id}"
+
+    async def push(self, *task_ids: str) -> int:
+        """
+        Queue task IDs on the shared queue, ahead of all lanes
+
+        New tasks go through the outbox and push_fair; this is for tasks that
+        must run again, such as those a consumer was cancelled on at shutdown.
+        """
+        serialized = [json.dumps(str(task_id)) for task_id in task_ids]
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lpush(self.name, *serialized)
+            pipe.lpush(self.signal_key, *(1 for _ in serialized))
+            length, _ = await pipe.execute()
+        return length
+
+    async def push_fair(self, entries: Iterable[Tuple[str, UUID, str]]) -> int:
+        """
+        Queue task IDs on their owners' sub-queues
+
+        Args:
+            entries: (task ID, user ID, lane) tuples, in creation order
+
+        Returns:
+            Number of queued task IDs
+        """
+        groups: Dict[Tuple[str, UUID], List[str]] = {}
+        for task_id, user_id, lane in entries:
+            groups.setdefault((lane, user_id), []).append(json.dumps(str(task_id)))
+        if not groups:
+            return 0
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for (lane, user_id), serialized in groups.items():
+                await self.enqueue_script(
+                    keys=[self.user_queue_key(lane, user_id), self.lane_key(lane), self.signal_key],
+                    args=[str(user_id), *serialized],
+                    client=pipe,
+                )
+            return sum(await pipe.execute())
+
+    async def _pop(self, timeout: int, processing_key: Optional[str]) -> Optional[bytes]:
+        # Wait for a token, but still look for work after a timeout: entries
+        # queued without a token (legacy producers) are picked up by polling
+        token = await self.redis.brpop(self.signal_key, timeout=timeout)
+        keys = [self.name, self.signal_key, *(self.lane_key(lane) for lane in LANES)]
+        if processing_key:
+            keys.append(processing_key)
+        message = await self.dequeue_script(
+            keys=keys,
+            args=[0 if token else 1, 1 if processing_key else 0],
+        )
+        return message or None
+
+    async def pop(self, timeout: int = 1) -> Optional[bytes]:
+        return await self._pop(timeout, None)
+
+    async def pop_reliable(self, worker_id: str, timeout: int = 1) -> Optional[bytes]:
+        return await self._pop(timeout, self.processing_key(worker_id))
+
+    async def estimate(self, user_id: UUID, lane: str) -> Tuple[int, int]:
+        """
+        Where a task the user queued now would land
+
+        Returns:
+            (total queued tasks, queued tasks that would start before it)
+        """
+        depth, ahead = await self.estimate_script(
+            keys=[
+                self.name,
+                self.signal_key,
+                self.user_queue_key(lane, user_id),
+                *(self.lane_key(ring_lane) for ring_lane in LANES),
+            ],
+            args=[LANES.index(lane) + 1],
+        )
+        return int(depth), int(ahead)
+
+    async def stats(self) -> Dict[str, int]:
+        """Queue depth, shared queue length and active users per lane"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.llen(self.signal_key)
+            pipe.llen(self.name)
+            for lane in LANES:
+                pipe.llen(self.lane_key(lane))
+            depth, shared, *active_users = await pipe.execute()
+
+        stats = {"depth": depth, "shared": shared}
+        for lane, users in zip(LANES, active_users):
+            stats[f"active_users:{lane}"] = users
+        return stats
+
+    async def record_completion(self, window: float) -> None:
+        """Log a finished task for the throughput estimate"""
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(self.completions_key, {uuid.uuid4().hex: now})
+            pipe.zremrangebyscore(self.completions_key, "-inf", now - window)
+            pipe.expire(self.completions_key, int(window) + 1)
+            await pipe.execute()
+
+    async def throughput(self, window: float) -> float:
+        """Tasks finished per second by all consumers over the last `window` seconds"""
+        completed = await self.redis.zcount(self.completions_key, time.time() - window, "+inf")
+        return completed / window
+
+    async def ack(self, worker_id: str, message: bytes) -> int:
+        return await self.redis.lrem(self.processing_key(worker_id), 1, message)
+
+    async def heartbeat(self, worker_id: str, ttl: int) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(self.workers_key, worker_id)
+            pipe.set(self.heartbeat_key(worker_id), 1, ex=ttl)
+            await pipe.execute()
+
+    async def unregister(self, worker_id: str) -> None:
+        # Dropping the heartbeat lets the reaper requeue anything left behind
+        await self.redis.delete(self.heartbeat_key(worker_id))
+
+    async def requeue_stale(self) -> int:
+        """
+        Move tasks held by workers whose heartbeat expired back onto the queue
+
+        Returns:
+            Number of requeued task IDs
+        """
+        requeued = 0
+        for raw_worker_id in await self.redis.smembers(self.workers_key):
+            worker_id = raw_worker_id.decode() if isinstance(raw_worker_id, bytes) else raw_worker_id
+            if await self.redis.exists(self.heartbeat_key(worker_id)):
+                continue
+
+            # Requeue at the consuming end of the shared queue so recovered
+            # tasks run next
+            while await self.redis.lmove(
+                self.processing_key(worker_id), self.name, src="RIGHT", dest="RIGHT"
+            ) is not None:
+                await self.redis.lpush(self.signal_key, 1)
+                requeued += 1
+
+            await self.redis.srem(self.workers_key, worker_id)
+
+        return requeued
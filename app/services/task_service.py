@@ -1,64 +1,184 @@
-import os
-from typing import List, Optional
-from uuid import UUID
+import base64
+import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_
+from sqlalchemy import select, insert, update, and_, tuple_
 from sqlalchemy.sql import desc
 import redis.asyncio as redis
-from google.cloud import storage
-import datetime
 
+from app.core.config import settings
 from app.models.task import Task, TaskStatus
+from app.models.task_outbox import TaskOutbox
 from app.models.user import User
-from app.schemas.task import TaskCreate
+from app.schemas.task import TaskCreate, TaskSummary
 from app.services.redis_service import RedisService
+from app.services.signed_url_service import signed_url_cache
+from app.services.task_events import publish_task_event
+from app.services.task_queue import TaskQueue
+
+
+def encode_task_cursor(created_at: datetime.datetime, task_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{task_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_task_cursor(cursor: str) -> Tuple[datetime.datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, task_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.datetime.fromisoformat(created_at), UUID(task_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
 
 class TaskService:
     def __init__(self, db: AsyncSession, redis_service: RedisService):
         self.db = db
         self.redis_service = redis_service
+        self.task_queue = TaskQueue(redis_service.redis)
 
     async def create_task(self, task_data: TaskCreate, user_id: UUID) -> UUID:
         """
-        Create a new task and push to Redis queue
+        Create a new task and queue it for processing
+
+        The task and its outbox entry are committed in one transaction; the
+        outbox relay then pushes the ID to the Redis queue. The ID and
+        defaults are generated here, so no refresh is needed after commit.
         """
         # Create task in database
+        now = datetime.datetime.utcnow()
         new_task = Task(
+            id=uuid4(),
             user_id=user_id,
             status=TaskStatus.CREATED,
             animal=task_data.animal,
-            text=task_data.text
+            text=task_data.text,
+            created_at=now
         )
 
         self.db.add(new_task)
+        self.db.add(TaskOutbox(task_id=new_task.id, created_at=now))
         await self.db.commit()
-        await self.db.refresh(new_task)
 
-        # Push task ID to Redis queue
-        await self.redis_service.lpush(
-            "generate_image_queue", 
-            str(new_task.id)
-        )
+        # Notify open SSE streams; a lost event only delays the UI update
+        try:
+            await publish_task_event(self.redis_service.redis, new_task)
+        except redis.RedisError:
+            pass
 
         return new_task.id
 
-    async def get_user_tasks(self, user_id: UUID) -> List[Task]:
+    async def create_tasks(self, tasks_data: List[TaskCreate], user_id: UUID) -> List[UUID]:
+        """
+        Create several tasks at once and queue them for processing
+
+        All tasks are written with one multi-row INSERT and
+        their outbox entries with another, in a single transaction. The
+        status events go out in a single Redis pipeline.
+
+        Returns:
+            IDs of the created tasks, in the order of `tasks_data`
         """
-        Get all tasks for a user
+        now = datetime.datetime.utcnow()
+        new_tasks = [
+            Task(
+                id=uuid4(),
+                user_id=user_id,
+                status=TaskStatus.CREATED,
+                animal=task_data.animal,
+                text=task_data.text,
+                created_at=now
+            )
+            for task_data in tasks_data
+        ]
+
+        # A multi-row INSERT stores every row or raises, so all IDs are valid
+        await self.db.execute(
+            insert(Task)
+            .values([
+                {
+                    "id": task.id,
+                    "user_id": task.user_id,
+                    "status": task.status,
+                    "animal": task.animal,
+                    "text": task.text,
+                    "created_at": task.created_at
+                }
+                for task in new_tasks
+            ])
+        )
+
+        await self.db.execute(
+            insert(TaskOutbox).values([
+                {"task_id": task.id, "created_at": now}
+                for task in new_tasks
+            ])
+        )
+        await self.db.commit()
+
+        try:
+            async with self.redis_service.redis.pipeline(transaction=False) as pipe:
+                for task in new_tasks:
+                    await publish_task_event(pipe, task)
+                await pipe.execute()
+        except redis.RedisError:
+            pass
+
+        return [task.id for task in new_tasks]
+
+    async def get_user_tasks(
+        self,
+        user_id: UUID,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[TaskSummary], Optional[str]]:
         """
-        self.db.expire_all()
-        query = select(Task).where(
+        Get a page of a user's tasks, newest first
+
+        Pages are keyset-paginated on (created_at, id), which the partial
+        index ix_tasks_user_id_created_at serves without sorting. Only the
+        listed columns are selected and rows are returned as TaskSummary
+        records, bypassing the ORM identity map.
+
+        Args:
+            user_id: Owner of the tasks
+            limit: Page size, capped at TASK_PAGE_SIZE_MAX (default: TASK_PAGE_SIZE_DEFAULT)
+            cursor: Opaque cursor from a previous page, or None for the first page
+
+        Returns:
+            (tasks, next_cursor), where next_cursor is None on the last page
+        """
+        limit = min(limit or settings.TASK_PAGE_SIZE_DEFAULT, settings.TASK_PAGE_SIZE_MAX)
+
+        query = select(
+            *(getattr(Task, column) for column in TaskSummary.columns)
+        ).where(
             and_(
                 Task.user_id == user_id,
                 Task.deleted_at == None
             )
-        ).order_by(desc(Task.created_at))
+        )
+
+        if cursor:
+            created_at, task_id = decode_task_cursor(cursor)
+            query = query.where(tuple_(Task.created_at, Task.id) < tuple_(created_at, task_id))
+
+        query = query.order_by(desc(Task.created_at), desc(Task.id)).limit(limit + 1)
 
         result = await self.db.execute(query)
-        tasks = result.scalars().all()
+        tasks = [TaskSummary(*row) for row in result.all()]
 
-        return tasks
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_task_cursor(tasks[-1].created_at, tasks[-1].id)
+
+        return tasks, next_cursor
 
     async def get_task_by_id(self, task_id: UUID, user_id: UUID) -> Optional[Task]:
         """
@@ -77,39 +197,43 @@ class TaskService:
 
         return task
 
-    def generate_signed_url(self, gcs_uri: str, expiration: int = 3600) -> str:
+    async def generate_signed_url(self, image_uri: str, expiration: int = None) -> Optional[str]:
         """
-        Generate a signed URL for a GCS object
+        Generate a signed URL for a stored image
+
+        Signed URLs are cached until shortly before they expire, so a popular
+        image is only signed once per expiration period.
 
         Args:
-            gcs_uri: The GCS URI in format 'gs://{bucket_name}/{object_name}'
-            expiration: URL expiration time in seconds (default: 1 hour)
+            image_uri: URI of the image in the storage backend, e.g. 'gs://{bucket_name}/{object_name}'
+            expiration: URL expiration time in seconds (default: SIGNED_URL_EXPIRATION)
 
         Returns:
-            Signed URL string
+            Signed URL string, or None if the image could not be signed
         """
-        if not gcs_uri or not gcs_uri.startswith('gs://'):
-            return None
-
-        # Parse bucket and object from URI
-        # Format: gs://bucket-name/path/to/object
-        parts = gcs_uri[5:].split('/', 1)  # Remove 'gs://' and split on first '/'
-        if len(parts) != 2:
-            return None
-
-        bucket_name, object_name = parts
-
-        # Create storage client and generate signed URL
-        print(os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"))
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(object_name)
-
-        # Generate signed URL with expiration time
-        url = blob.generate_signed_url(
-            version='v4',
-            expiration=datetime.timedelta(seconds=expiration),
-            method='GET'
+        redis_client = self.redis_service.redis if settings.SIGNED_URL_REDIS_CACHE else None
+        return await signed_url_cache.get(
+            image_uri,
+            expiration or settings.SIGNED_URL_EXPIRATION,
+            redis_client=redis_client
         )
 
-        return url
+    async def generate_signed_urls(self, image_uris: Iterable[str], expiration: int = None) -> Dict[str, Optional[str]]:
+        """
+        Generate signed URLs for several stored images at once
+
+        Cached URLs are reused and only the misses are signed, concurrently.
+
+        Args:
+            image_uris: URIs of the images in the storage backend
+            expiration: URL expiration time in seconds (default: SIGNED_URL_EXPIRATION)
+
+        Returns:
+            Mapping of image URI to signed URL, None for images that could not be signed
+        """
+        redis_client = self.redis_service.redis if settings.SIGNED_URL_REDIS_CACHE else None
+        return await signed_url_cache.get_many(
+            image_uris,
+            expiration or settings.SIGNED_URL_EXPIRATION,
+            redis_client=redis_client
+        )
@@ -1,8 +1,17 @@
-from .auth import get_password_hash, verify_password, create_access_token, decode_access_token
+from .auth import (
+    get_password_hash,
+    verify_password,
+    get_password_hash_async,
+    verify_password_async,
+    create_access_token,
+    decode_access_token,
+)
 
 __all__ = [
     "get_password_hash", 
     "verify_password", 
+    "get_password_hash_async",
+    "verify_password_async",
     "create_access_token", 
     "decode_access_token",
 ]
@@ -1,5 +1,8 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -11,6 +14,7 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.core.db.session import get_db
 from app.models.user import User
+from app.schemas.user import CurrentUser
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = HTTPBearer()
@@ -24,6 +28,41 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+# bcrypt releases the GIL, so a small thread pool takes hashing off the event
+# loop without blocking other requests. Work beyond PASSWORD_HASH_MAX_PENDING
+# queued or running hashes is shed with a 503.
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_password_hash_pending = 0
+
+
+async def _run_password_hash(func, *args):
+    global _password_hash_pending
+    if _password_hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+        )
+
+    _password_hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_hash_executor, func, *args)
+    finally:
+        _password_hash_pending -= 1
+
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_password_hash(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password):
+    return await _run_password_hash(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -43,13 +82,26 @@ def decode_access_token(token: str):
         return None
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> CurrentUser:
+    """
+    Resolve the user of a bearer token, verifying the user still exists
+
+    Costs a database lookup per call; endpoints that only need the token's
+    claims use get_token_user instead.
+    """
+    credentials_exception = _credentials_exception()
+
     token = credentials.credentials
 
     payload = decode_access_token(token)
@@ -60,6 +112,11 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(o
     if user_id is None:
         raise credentials_exception
 
+    try:
+        user_id = str(UUID(user_id))
+    except ValueError:
+        raise credentials_exception
+
     user = await db.scalar(
         select(User)
         .where(User.id == user_id)
@@ -67,6 +124,25 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(o
     if user is None:
         raise credentials_exception
 
-    print("HELLO USER", user)
-    return user
+    return CurrentUser(id=user.id, username=user.username, role=user.role)
 
+
+async def get_token_user(
+    credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> CurrentUser:
+    """
+    Resolve the user of a bearer token from its signed claims alone
+
+    No lookup happens for tokens carrying id, username and role, so a deleted
+    user keeps access until the token expires. Tokens issued before the role
+    claim existed fall back to get_current_user.
+    """
+    payload = decode_access_token(credentials.credentials)
+    if payload is None:
+        raise _credentials_exception()
+
+    try:
+        return CurrentUser(id=payload["id"], username=payload["sub"], role=payload["role"])
+    except (KeyError, ValueError):
+        return await get_current_user(credentials, db)
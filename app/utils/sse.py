@@ -0,0 +1,17 @@
+from typing import Any, Optional
+
+from app.core.serialization import dumps
+
+
+def sse_frame(data: Any, event: Optional[str] = None, id: Optional[Any] = None) -> bytes:
+    """Build a Server-Sent Events frame with a JSON payload"""
+    frame = b""
+    if id is not None:
+        frame += f"id: {id}\n".encode()
+    if event is not None:
+        frame += f"event: {event}\n".encode()
+    return frame + b"data: " + dumps(data) + b"\n\n"
+
+
+def sse_comment(text: str) -> bytes:
+    return f": {text}\n\n".encode()
@@ -0,0 +1,97 @@
+"""
+Compare the old and new encoding of a task list SSE frame.
+
+"current" converts UUIDs and enums by hand and encodes with json.dumps, as the
+SSE stream used to. "fast" passes TaskSummary.to_dict() output straight to
+app.core.serialization, once per available serializer.
+
+Usage:
+    python -m benchmarks.bench_json --tasks 500 --repeat 2000
+"""
+import argparse
+import datetime
+import json
+import os
+import timeit
+import uuid
+
+# app.core loads settings on import; the benchmark needs no real services
+# (the URLs must still parse, since the database engine is built on import)
+for name, value in {
+    "DATABASE_URL": "postgresql+asyncpg://bench@localhost/bench",
+    "SYNC_DATABASE_URL": "postgresql://bench@localhost/bench",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "SECRET_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.core.serialization import SERIALIZERS  # noqa: E402
+from app.models.task import TaskStatus  # noqa: E402
+from app.schemas.task import TaskSummary  # noqa: E402
+from app.utils.sse import sse_frame  # noqa: E402
+
+
+def make_tasks(count):
+    statuses = list(TaskStatus)
+    now = datetime.datetime.utcnow()
+    return [
+        TaskSummary(
+            uuid.uuid4(),
+            "corgi",
+            "HELLO",
+            statuses[i % len(statuses)],
+            None,
+            now - datetime.timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def encode_current(tasks):
+    task_list = []
+    for task in tasks:
+        task_list.append({
+            "id": str(task.id),
+            "animal": task.animal,
+            "text": task.text,
+            "status": task.status,
+            "image_uri": None,
+        })
+    response_data = {"success": True, "data": {"tasks": task_list}}
+    return f"data: {json.dumps(response_data)}\n\n".encode()
+
+
+def make_encode_fast(dumps):
+    def encode(tasks):
+        response_data = {"success": True, "data": {"tasks": [task.to_dict() for task in tasks]}}
+        return b"data: " + dumps(response_data) + b"\n\n"
+    return encode
+
+
+def main(args):
+    tasks = make_tasks(args.tasks)
+    candidates = {"current": encode_current}
+    for name, dumps in SERIALIZERS.items():
+        candidates[f"fast[{name}]"] = make_encode_fast(dumps)
+
+    # Sanity check: the frames decode to the same payload
+    expected = json.loads(encode_current(tasks)[len(b"data: "):])
+    for name, encode in candidates.items():
+        assert json.loads(encode(tasks)[len(b"data: "):]) == expected, name
+    assert json.loads(sse_frame(expected)[len(b"data: "):]) == expected
+
+    baseline = None
+    print(f"{args.tasks} tasks, best of {args.rounds} x {args.repeat} encodes")
+    for name, encode in candidates.items():
+        best = min(timeit.repeat(lambda: encode(tasks), number=args.repeat, repeat=args.rounds))
+        per_call_us = best / args.repeat * 1e6
+        baseline = baseline or per_call_us
+        print(f"{name:<14} {per_call_us:9.1f} us/frame  {baseline / per_call_us:5.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,95 @@
+"""
+Measure /ping latency while the API is hit by a burst of logins.
+
+Password hashing must not block the event loop, so the p99 of /ping during
+the storm should stay close to the idle baseline.
+
+Usage:
+    python -m benchmarks.bench_login_storm --base-url http://localhost:8000 --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(label, samples):
+    print(
+        f"{label:<10} n={len(samples):<5} "
+        f"p50={percentile(samples, 50):7.2f}ms "
+        f"p99={percentile(samples, 99):7.2f}ms "
+        f"max={max(samples):7.2f}ms "
+        f"mean={statistics.mean(samples):7.2f}ms"
+    )
+
+
+async def sample_ping(client, stop, interval):
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/ping")
+        response.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def login_storm(client, username, password, logins, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = {}
+
+    async def login():
+        async with semaphore:
+            response = await client.post("/auth/login", json={"username": username, "password": password})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return statuses
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        username = f"bench-{uuid.uuid4().hex[:12]}"
+        password = uuid.uuid4().hex
+        response = await client.post("/auth/register", json={"username": username, "password": password})
+        response.raise_for_status()
+
+        # Idle baseline
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_ping(client, stop, args.ping_interval))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        baseline = await sampler
+
+        # Same sampling while the login storm runs
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_ping(client, stop, args.ping_interval))
+        start = time.perf_counter()
+        statuses = await login_storm(client, username, password, args.logins, args.concurrency)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        storm = await sampler
+
+    print(f"{args.logins} logins in {elapsed:.2f}s, responses by status: {statuses}")
+    summarize("baseline", baseline)
+    summarize("storm", storm)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--ping-interval", type=float, default=0.01)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    asyncio.run(main(parser.parse_args()))
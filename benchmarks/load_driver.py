@@ -0,0 +1,189 @@
+"""
+Drive synthetic load through the API and consumer and report throughput and latency.
+
+Tasks are submitted at a fixed rate through /tasks/create while an SSE
+stream per user records when each task starts and finishes. Run the
+consumer with IMAGE_GENERATOR=stub (and STORAGE_BACKEND=local) to measure
+the pipeline without any outside services.
+
+Run the API with RATE_LIMIT_ENABLED=false and ADMISSION_CONTROL_ENABLED=false.
+The default limits allow far fewer tasks per user than the example below
+submits, and every rejected request only shows up in the `rejected` count.
+
+Reported per task:
+    queue    submit -> IN_PROGRESS (time spent waiting for a consumer)
+    process  IN_PROGRESS -> DONE
+    e2e      submit -> DONE
+
+Usage:
+    python -m benchmarks.load_driver --base-url http://localhost:8000 --tasks 500 --rate 50 --users 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import httpx
+
+ANIMALS = ["cat", "dog", "fox", "owl", "panda", "rabbit", "tiger", "koala"]
+
+# Tasks per snapshot frame (the API's default TASK_PAGE_SIZE_MAX)
+SNAPSHOT_LIMIT = 200
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(label, samples):
+    if not samples:
+        print(f"{label:<8} n=0")
+        return
+    print(
+        f"{label:<8} n={len(samples):<5} "
+        f"p50={percentile(samples, 50):8.1f}ms "
+        f"p99={percentile(samples, 99):8.1f}ms "
+        f"max={max(samples):8.1f}ms"
+    )
+
+
+class LoadStats:
+    def __init__(self):
+        self.submitted = {}
+        self.started = {}
+        self.finished = {}
+        self.failed = set()
+        self.rejected = 0
+        self.all_finished = asyncio.Event()
+
+    def record_event(self, task: dict) -> None:
+        task_id, status, now = task["id"], task["status"], time.perf_counter()
+        if status == "IN_PROGRESS":
+            self.started.setdefault(task_id, now)
+        elif status in ("DONE", "ERROR"):
+            self.finished.setdefault(task_id, now)
+            if status == "ERROR":
+                self.failed.add(task_id)
+        self.check_finished()
+
+    def check_finished(self) -> None:
+        if self.submitted and all(task_id in self.finished for task_id in self.submitted):
+            self.all_finished.set()
+
+
+async def create_user(client):
+    username = f"load-{uuid.uuid4().hex[:12]}"
+    password = uuid.uuid4().hex
+    response = await client.post("/auth/register", json={"username": username, "password": password})
+    response.raise_for_status()
+    response = await client.post("/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+
+async def watch_events(client, headers, stats, ready):
+    # One SSE stream per user. The server coalesces or drops events for a slow
+    # client and then resends a snapshot, so snapshot frames are recorded too.
+    params = {"limit": SNAPSHOT_LIMIT}
+    async with client.stream("GET", "/tasks", headers=headers, params=params, timeout=None) as response:
+        response.raise_for_status()
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):])["data"]
+                if event == "task":
+                    stats.record_event(data["task"])
+                elif event is None:
+                    for task in data["tasks"]:
+                        stats.record_event(task)
+                ready.set()
+            elif not line:
+                event = None
+
+
+async def submit(client, headers, stats, index):
+    payload = {"animal": random.choice(ANIMALS), "text": f"t{index}"[:8]}
+    start = time.perf_counter()
+    response = await client.post("/tasks/create", json=payload, headers=headers)
+    if response.status_code != 200:
+        stats.rejected += 1
+        return
+    stats.submitted[response.json()["data"]["task_id"]] = start
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.users + args.concurrency + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        users = [await create_user(client) for _ in range(args.users)]
+        stats = LoadStats()
+
+        watchers = []
+        for headers in users:
+            ready = asyncio.Event()
+            watchers.append(asyncio.create_task(watch_events(client, headers, stats, ready)))
+            await asyncio.wait_for(ready.wait(), timeout=10)
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        interval = 1 / args.rate if args.rate > 0 else 0
+
+        async def submit_one(index):
+            async with semaphore:
+                await submit(client, users[index % len(users)], stats, index)
+
+        start = time.perf_counter()
+        submissions = []
+        for index in range(args.tasks):
+            submissions.append(asyncio.create_task(submit_one(index)))
+            if interval:
+                # Keep a fixed schedule instead of drifting with the sleep overhead
+                await asyncio.sleep(max(0.0, start + (index + 1) * interval - time.perf_counter()))
+        await asyncio.gather(*submissions)
+        submit_elapsed = time.perf_counter() - start
+
+        # Only meaningful once every task has been submitted
+        stats.all_finished.clear()
+        stats.check_finished()
+        try:
+            await asyncio.wait_for(stats.all_finished.wait(), timeout=args.timeout)
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - start
+
+        for watcher in watchers:
+            watcher.cancel()
+        await asyncio.gather(*watchers, return_exceptions=True)
+
+    done = [task_id for task_id in stats.submitted if task_id in stats.finished and task_id not in stats.failed]
+    unfinished = len(stats.submitted) - len([task_id for task_id in stats.submitted if task_id in stats.finished])
+    queue = [(stats.started[t] - stats.submitted[t]) * 1000 for t in stats.submitted if t in stats.started]
+    process = [(stats.finished[t] - stats.started[t]) * 1000 for t in done if t in stats.started]
+    e2e = [(stats.finished[t] - stats.submitted[t]) * 1000 for t in done]
+
+    print(
+        f"submitted {len(stats.submitted)} tasks in {submit_elapsed:.2f}s "
+        f"({len(stats.submitted) / submit_elapsed:.1f}/s), rejected {stats.rejected}"
+    )
+    print(
+        f"done {len(done)}, errors {len(stats.failed)}, unfinished {unfinished} after {elapsed:.2f}s, "
+        f"throughput {len(done) / elapsed:.2f} tasks/s"
+    )
+    summarize("queue", queue)
+    summarize("process", process)
+    summarize("e2e", e2e)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=20.0, help="Tasks submitted per second, 0 for no limit")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=50, help="Maximum concurrent create requests")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for tasks to finish")
+    asyncio.run(main(parser.parse_args()))
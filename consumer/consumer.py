@@ -1,23 +1,43 @@
 import asyncio
+import functools
 import json
 import logging
 import os
 import signal
+import socket
 import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Set
 
+import httpx
+from prometheus_client import start_http_server
 import redis.asyncio as redis
-import replicate
 from dotenv import load_dotenv
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.db.session import AsyncSessionLocal
+from app.core.storage import StorageBackend, create_storage_backend
 from app.models.task import Task, TaskStatus
+from app.services.task_events import publish_task_event
+from app.services.task_queue import TaskQueue
+from consumer.generation_cache import GenerationCache
+from consumer.generators import ImageGenerator, create_image_generator
+from consumer.metrics import (
+    STAGE_SECONDS,
+    TASK_SECONDS,
+    QUEUE_WAIT_SECONDS,
+    TASKS_PROCESSED,
+    GENERATION_CACHE_HITS,
+    TASKS_IN_FLIGHT,
+    CONCURRENCY,
+)
+from consumer.streaming import open_output_stream
 
 from datetime import datetime
-from google.cloud import storage
-from google.oauth2 import service_account
 
 # Configure logging
 logging.basicConfig(
@@ -31,110 +51,281 @@ class RedisConsumer:
     def __init__(self):
         self.redis_client = None
         self.running = False
-        self.queue_name = "generate_image_queue"
+        self.queue_name = settings.TASK_QUEUE_NAME
+        self.task_queue: Optional[TaskQueue] = None
         self.shutdown_event = asyncio.Event()
 
+        # Reliable mode keeps popped IDs in a per-worker processing list until
+        # they are acknowledged, and requeues the lists of dead workers.
+        self.reliable = settings.TASK_QUEUE_RELIABLE
+        self.worker_id = settings.CONSUMER_ID or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.maintenance_task: Optional[asyncio.Task] = None
+        self.generation_cache: Optional[GenerationCache] = None
+        self.storage: Optional[StorageBackend] = None
+        self.generator: ImageGenerator = create_image_generator()
+
+        # Bounded worker pool: at most `concurrency` tasks are in flight, and
+        # the blocking generator / storage calls run on a dedicated thread pool
+        # so they never stall the event loop.
+        self.concurrency = max(1, settings.CONSUMER_CONCURRENCY)
+        CONCURRENCY.set(self.concurrency)
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.in_flight: Set[asyncio.Task] = set()
+        self.thread_pool_size = settings.CONSUMER_THREAD_POOL_SIZE or self.concurrency * 2
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.thread_pool_size,
+            thread_name_prefix="consumer-io",
+        )
+        # Pooled client for downloading generated images
+        self.http_client = httpx.Client(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            follow_redirects=True,
+        )
+
     async def connect(self) -> None:
         try:
             self.redis_client = redis.from_url(settings.REDIS_URL)
             await self.redis_client.ping()
+            self.task_queue = TaskQueue(self.redis_client, self.queue_name)
+            if self.storage is None:
+                self.storage = create_storage_backend(
+                    credentials_json=settings.GOOGLE_CREDENTIALS_JSON,
+                    pool_size=self.thread_pool_size,
+                )
+                # Bad credentials fail startup instead of the first task
+                await self.run_blocking(self.storage.connect)
+            self.generation_cache = GenerationCache(
+                self.redis_client,
+                mode=settings.GENERATION_CACHE_MODE,
+                pool_size=settings.GENERATION_CACHE_POOL_SIZE,
+                ttl=settings.GENERATION_CACHE_TTL,
+                lock_ttl=settings.GENERATION_CACHE_LOCK_TTL,
+            )
             logger.info("Successfully connected to Redis")
         except redis.RedisError as e:
             logger.error(f"Failed to connect to Redis: {str(e)}")
             raise
 
+    async def run_blocking(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
     async def process_task(self, task_id: str, session: AsyncSession) -> None:
         logger.info(f"Processing task: {task_id}")
+        started = time.perf_counter()
 
         try:
             if not task_id:
                 logger.error("Missing item_id in payload")
                 return
 
-            task: Task = await session.scalar(select(Task).where(Task.id == task_id))
+            with STAGE_SECONDS.labels("fetch").time():
+                task: Task = await session.scalar(select(Task).where(Task.id == task_id))
             if not task:
                 logger.error(f"Task with id {task_id} not found")
                 return
 
-            task.status = TaskStatus.IN_PROGRESS
-            await session.commit()
+            if task.status in (TaskStatus.DONE, TaskStatus.ERROR):
+                # Redelivered after a crash or requeue; nothing left to do
+                logger.info(f"Task {task_id} already finished with status {task.status.value}, skipping")
+                TASKS_PROCESSED.labels("skipped").inc()
+                return
 
-            logger.info(f"Processing task {task_id}: {task.animal} with text '{task.text}'")
+            QUEUE_WAIT_SECONDS.observe(max(0.0, (datetime.utcnow() - task.created_at).total_seconds()))
 
-            output = replicate.run(
-                "black-forest-labs/flux-schnell",
-                input={
-                    "prompt": f"Generate a high-quality, front-facing portrait of a {task.animal} of any breed or species. The animal should be looking directly at the camera with a joyful or expressive face. It must be wearing a plain white shirt that has {task.text} text on it. Optionally, the animal can also wear stylish accessories like a hat, sunglasses, or scarf. Use a minimal, soft background to keep the focus on the animal."
-                }
-            )
+            task.status = TaskStatus.IN_PROGRESS
+            with STAGE_SECONDS.labels("commit").time():
+                await session.commit()
+            await self.publish_status(task)
 
-            with open(f'{task.id}.png', 'wb') as f:
-                f.write(output[0].read())
+            logger.info(f"Processing task {task_id}: {task.animal} with text '{task.text}'")
 
-            uri = await self.upload_image_to_gcs(task, f'{task.id}.png')
+            uri = await self.produce_image(task)
 
             task.status = TaskStatus.DONE
             task.image_uri = uri
-            await session.commit()
+            with STAGE_SECONDS.labels("commit").time():
+                await session.commit()
+            await self.publish_status(task)
+            await self.record_completion()
+            TASKS_PROCESSED.labels("done").inc()
+            TASK_SECONDS.observe(time.perf_counter() - started)
             logger.info(f"Task {task_id} completed successfully")
 
         except Exception as e:
             logger.error(f"Error processing task {task_id}: {str(e)}")
+            TASKS_PROCESSED.labels("error").inc()
+            TASK_SECONDS.observe(time.perf_counter() - started)
             try:
                 task = await session.scalar(select(Task).where(Task.id == task_id))
                 if task:
                     task.status = TaskStatus.ERROR
                     await session.commit()
+                    await self.publish_status(task)
+                    await self.record_completion()
             except Exception as commit_err:
                 logger.error(f"Failed to mark task as error: {str(commit_err)}")
 
-    async def upload_image_to_gcs(self, task: Task, local_file_path: str):
-        bucket_name = "pet-tee"
+    async def produce_image(self, task: Task) -> str:
+        generated = False
+
+        async def generate() -> str:
+            nonlocal generated
+            generated = True
+            with STAGE_SECONDS.labels("generate").time():
+                image = await self.run_blocking(self.generate_image, task.animal, task.text)
+            # Download and upload are one pipelined stream, so they are timed together
+            with STAGE_SECONDS.labels("store").time():
+                return await self.store_image(task, image)
+
+        if not self.generation_cache.enabled:
+            return await generate()
+
+        uri = await self.generation_cache.get_or_generate(task.animal, task.text, generate)
+        if not generated:
+            GENERATION_CACHE_HITS.inc()
+        return uri
+
+    async def publish_status(self, task: Task) -> None:
+        # Best effort: SSE clients fall back to the next snapshot if this is lost
+        try:
+            await publish_task_event(self.redis_client, task)
+        except redis.RedisError as e:
+            logger.error(f"Failed to publish status for task {task.id}: {str(e)}")
+
+    async def record_completion(self) -> None:
+        # Feeds the API's throughput estimate for admission control and ETAs
+        try:
+            await self.task_queue.record_completion(settings.THROUGHPUT_WINDOW)
+        except redis.RedisError as e:
+            logger.error(f"Failed to record task completion: {str(e)}")
+
+    def generate_image(self, animal: str, text: str):
+        # Blocking: runs on the consumer thread pool
+        return self.generator.generate(animal, text)
+
+    def stream_image_to_storage(self, image, name: str) -> str:
+        # Blocking: pipes the generator output into storage without a temp file
+        with open_output_stream(image, self.http_client, settings.IMAGE_DOWNLOAD_CHUNK_SIZE) as (chunks, size):
+            return self.storage.put_stream(name, chunks, size, "image/png")
+
+    async def store_image(self, task: Task, image) -> str:
         now = datetime.utcnow()
         date_path = now.strftime("%Y/%m/%d")
         full_timestamp = now.strftime("%Y%m%dT%H%M%S%f")
-        gcs_blob_name = f"{date_path}/{full_timestamp}_{task.id}.png"
+        name = f"{date_path}/{full_timestamp}_{task.id}.png"
+
+        uri = await self.run_blocking(self.stream_image_to_storage, image, name)
+        logger.info(f"Uploaded to {uri}")
+        return uri
 
+    async def release_task(self, task_id: str) -> None:
+        """
+        Hand back a task cancelled by shutdown
+
+        An unfinished task goes back to CREATED, so it does not look stuck in
+        IN_PROGRESS. Outside reliable mode it is also queued again; in reliable
+        mode it is still in the processing list and the reaper requeues it.
+        """
         try:
-            creds_json = os.environ["GOOGLE_CREDENTIALS_JSON"]
-            creds_dict = json.loads(creds_json)
-            credentials = service_account.Credentials.from_service_account_info(creds_dict)
+            async with AsyncSessionLocal() as session:
+                task = await session.scalar(
+                    update(Task)
+                    .where(Task.id == task_id, Task.status.in_([TaskStatus.CREATED, TaskStatus.IN_PROGRESS]))
+                    .values(status=TaskStatus.CREATED)
+                    .returning(Task)
+                )
+                await session.commit()
+            if task is None:
+                return
+
+            await self.publish_status(task)
+            if not self.reliable:
+                await self.task_queue.push(task_id)
+            logger.info(f"Task {task_id} was interrupted by shutdown and requeued")
         except Exception as e:
-            logger.error(f"Failed to load service account credentials: {e}")
+            logger.error(f"Failed to requeue interrupted task {task_id}: {str(e)}")
+
+    async def handle_message(self, message: bytes) -> None:
+        data = None
+        try:
+            data = json.loads(message)
+            async with AsyncSessionLocal() as session:
+                await self.process_task(data, session)
+        except json.JSONDecodeError:
+            logger.error(f"Failed to decode JSON message: {message}")
+        except asyncio.CancelledError:
+            if data:
+                await self.release_task(data)
             raise
+        except Exception as e:
+            logger.error(f"Error processing message: {str(e)}")
 
-        client = storage.Client(credentials=credentials, project=creds_dict.get("project_id"))
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(gcs_blob_name)
-        blob.upload_from_filename(local_file_path, content_type="image/png")
-        logger.info(f"Uploaded to gs://{bucket_name}/{gcs_blob_name}")
-        os.remove(local_file_path)
-        return f"gs://{bucket_name}/{gcs_blob_name}"
+        # Not reached on cancellation, so an unfinished task stays in the
+        # processing list and is picked up again by the reaper
+        if self.reliable:
+            try:
+                await self.task_queue.ack(self.worker_id, message)
+            except redis.RedisError as e:
+                logger.error(f"Failed to acknowledge message {message}: {str(e)}")
+
+    async def maintain(self) -> None:
+        interval = settings.TASK_QUEUE_REAP_INTERVAL
+        while not self.shutdown_event.is_set():
+            try:
+                await self.task_queue.heartbeat(self.worker_id, settings.TASK_QUEUE_HEARTBEAT_TTL)
+                requeued = await self.task_queue.requeue_stale()
+                if requeued:
+                    logger.warning(f"Requeued {requeued} task(s) from dead workers")
+            except redis.RedisError as e:
+                logger.error(f"Queue maintenance failed: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self.shutdown_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self.in_flight.discard(task)
+        TASKS_IN_FLIGHT.dec()
+        self.slots.release()
 
     async def listen(self) -> None:
         if not self.redis_client:
             await self.connect()
 
         self.running = True
-        logger.info(f"Starting to listen on queue: {self.queue_name}")
+        logger.info(f"Starting to listen on queue: {self.queue_name} (concurrency={self.concurrency})")
+
+        if self.reliable:
+            logger.info(f"Reliable queue mode enabled, worker id: {self.worker_id}")
+            await self.task_queue.heartbeat(self.worker_id, settings.TASK_QUEUE_HEARTBEAT_TTL)
+            self.maintenance_task = asyncio.create_task(self.maintain())
 
         while self.running and not self.shutdown_event.is_set():
+            # Backpressure: only pop a new task once a worker slot is free
+            await self.slots.acquire()
+            if self.shutdown_event.is_set():
+                self.slots.release()
+                break
+
             try:
-                result = await self.redis_client.brpop(self.queue_name, timeout=1)
-                if not result:
+                if self.reliable:
+                    message = await self.task_queue.pop_reliable(self.worker_id, timeout=1)
+                else:
+                    message = await self.task_queue.pop(timeout=1)
+                if message is None:
+                    self.slots.release()
                     continue
 
-                _, message = result
                 logger.debug(f"Received message: {message}")
-                try:
-                    data = json.loads(message)
-                    async with AsyncSessionLocal() as session:
-                        await self.process_task(data, session)
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to decode JSON message: {message}")
-                except Exception as e:
-                    logger.error(f"Error processing message: {str(e)}")
+                task = asyncio.create_task(self.handle_message(message))
+                self.in_flight.add(task)
+                TASKS_IN_FLIGHT.inc()
+                task.add_done_callback(self._on_task_done)
             except redis.RedisError as e:
+                self.slots.release()
                 logger.error(f"Redis error: {str(e)}")
                 await asyncio.sleep(5)
                 try:
@@ -142,26 +333,65 @@ class RedisConsumer:
                 except:
                     pass
             except asyncio.CancelledError:
+                self.slots.release()
                 logger.info("Consumer task cancelled")
                 self.running = False
                 break
             except Exception as e:
+                self.slots.release()
                 logger.error(f"Unexpected error: {str(e)}")
                 await asyncio.sleep(1)
 
-    async def shutdown(self) -> None:
-        logger.info("Shutting down consumer...")
+    async def drain(self) -> None:
+        if not self.in_flight:
+            return
+
+        logger.info(f"Waiting for {len(self.in_flight)} in-flight task(s) to finish...")
+        _, pending = await asyncio.wait(set(self.in_flight), timeout=settings.CONSUMER_DRAIN_TIMEOUT)
+        if pending:
+            logger.warning(f"Cancelling {len(pending)} task(s) still running after drain timeout")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stop(self) -> None:
+        # Stop pulling new work; in-flight tasks are drained in shutdown()
         self.running = False
         self.shutdown_event.set()
+
+    async def shutdown(self) -> None:
+        logger.info("Shutting down consumer...")
+        self.stop()
+        await self.drain()
+        # Threads of cancelled tasks are not interrupted: a generator or upload
+        # call keeps running until it returns, and its result is discarded
+        self.executor.shutdown(wait=False)
+        self.http_client.close()
+
+        if self.maintenance_task:
+            await asyncio.gather(self.maintenance_task, return_exceptions=True)
+            self.maintenance_task = None
+
         if self.redis_client:
+            if self.reliable:
+                try:
+                    await self.task_queue.unregister(self.worker_id)
+                except redis.RedisError as e:
+                    logger.error(f"Failed to unregister worker: {str(e)}")
             await self.redis_client.close()
+            self.redis_client = None
 
 
 async def main() -> None:
     consumer = RedisConsumer()
     loop = asyncio.get_running_loop()
     for sig in (signal.SIGINT, signal.SIGTERM):
-        loop.add_signal_handler(sig, lambda: asyncio.create_task(consumer.shutdown()))
+        loop.add_signal_handler(sig, consumer.stop)
+
+    if settings.METRICS_ENABLED and settings.CONSUMER_METRICS_PORT:
+        # Serves /metrics from a background thread
+        start_http_server(settings.CONSUMER_METRICS_PORT)
+        logger.info(f"Serving metrics on port {settings.CONSUMER_METRICS_PORT}")
 
     try:
         await consumer.listen()
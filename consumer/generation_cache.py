@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import logging
+import random
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as redis
+
+logger = logging.getLogger('task_consumer')
+
+MODE_OFF = "off"
+MODE_REUSE = "reuse"
+MODE_POOL = "pool"
+
+# Delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class GenerationCache:
+    """
+    Reuses generated images for repeated (animal, text) pairs.
+
+    In "reuse" mode the first image generated for a pair is served to every
+    later task. In "pool" mode up to `pool_size` variants are generated and
+    later tasks pick one at random. Concurrent misses for the same pair are
+    coalesced into a single generation, within the process via a shared
+    future and across consumers via a Redis lock.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        mode: str,
+        pool_size: int,
+        ttl: int,
+        lock_ttl: int,
+        poll_interval: float = 0.5,
+    ):
+        self.redis = redis_client
+        self.mode = mode
+        self.pool_size = pool_size if mode == MODE_POOL else 1
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in (MODE_REUSE, MODE_POOL)
+
+    @staticmethod
+    def cache_key(animal: str, text: str) -> str:
+        # Animal is case-insensitive; the shirt text keeps its case
+        normalized = f"{animal.strip().casefold()}\x1f{' '.join(text.split())}"
+        digest = hashlib.sha256(normalized.encode()).hexdigest()
+        return f"generation_cache:{digest}"
+
+    async def _pick(self, key: str) -> Optional[str]:
+        uris = await self.redis.lrange(key, 0, -1)
+        if len(uris) < self.pool_size:
+            return None
+        uri = random.choice(uris)
+        return uri.decode() if isinstance(uri, bytes) else uri
+
+    async def get_or_generate(self, animal: str, text: str, generate: Callable[[], Awaitable[str]]) -> str:
+        """
+        Get a cached image URI for the pair, or generate one
+
+        Args:
+            generate: Produces and stores a new image, returning its URI
+        """
+        key = self.cache_key(animal, text)
+
+        uri = await self._pick(key)
+        if uri is not None:
+            logger.info(f"Generation cache hit for '{animal}' / '{text}'")
+            return uri
+
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            uri = await self._generate_single_flight(key, generate)
+            future.set_result(uri)
+            return uri
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody waited on is not logged
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
+
+    async def _generate_single_flight(self, key: str, generate: Callable[[], Awaitable[str]]) -> str:
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        seen = await self.redis.llen(key)
+
+        while not await self.redis.set(lock_key, token, nx=True, ex=self.lock_ttl):
+            # Another consumer is generating this pair; take its result
+            await asyncio.sleep(self.poll_interval)
+            if await self.redis.llen(key) > seen:
+                uri = await self.redis.lindex(key, 0)
+                return uri.decode() if isinstance(uri, bytes) else uri
+
+        try:
+            uri = await generate()
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.lpush(key, uri)
+                pipe.ltrim(key, 0, self.pool_size - 1)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+            return uri
+        finally:
+            try:
+                await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except redis.RedisError as e:
+                logger.error(f"Failed to release generation lock {lock_key}: {str(e)}")
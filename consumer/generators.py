@@ -0,0 +1,143 @@
+import hashlib
+import math
+import random
+import struct
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import replicate
+
+from app.core.config import settings
+
+PROMPT_TEMPLATE = (
+    "Generate a high-quality, front-facing portrait of a {animal} of any breed or species. "
+    "The animal should be looking directly at the camera with a joyful or expressive face. "
+    "It must be wearing a plain white shirt that has {text} text on it. "
+    "Optionally, the animal can also wear stylish accessories like a hat, sunglasses, or scarf. "
+    "Use a minimal, soft background to keep the focus on the animal."
+)
+
+LATENCY_FIXED = "fixed"
+LATENCY_UNIFORM = "uniform"
+LATENCY_LOGNORMAL = "lognormal"
+
+
+class ImageGenerator(ABC):
+    """
+    Produces an image for an (animal, text) pair.
+
+    `generate` is blocking and runs on the consumer thread pool. It returns
+    either raw PNG bytes or a generator output object that
+    `open_output_stream` can stream (an object with a `url`, or an iterable
+    of byte chunks).
+    """
+
+    @abstractmethod
+    def generate(self, animal: str, text: str):
+        """Generate one image"""
+
+
+class ReplicateImageGenerator(ImageGenerator):
+    def __init__(self, model: str):
+        self.model = model
+
+    def generate(self, animal: str, text: str):
+        output = replicate.run(
+            self.model,
+            input={"prompt": PROMPT_TEMPLATE.format(animal=animal, text=text)}
+        )
+
+        return output[0]
+
+
+class StubImageGenerator(ImageGenerator):
+    """
+    Local generator for load tests: sleeps for a sampled latency, then
+    returns a PNG whose pixels are derived from the (animal, text) pair.
+
+    The image is filled with seeded noise so it does not compress, which
+    keeps the stored size close to width * height * 3 bytes.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        latency_distribution: str = LATENCY_LOGNORMAL,
+        latency_mean: float = 2.0,
+        latency_stddev: float = 0.5,
+        seed: Optional[int] = None,
+    ):
+        if latency_distribution not in (LATENCY_FIXED, LATENCY_UNIFORM, LATENCY_LOGNORMAL):
+            raise ValueError(f"Unknown stub latency distribution: {latency_distribution}")
+
+        self.width = width
+        self.height = height
+        self.latency_distribution = latency_distribution
+        self.latency_mean = max(0.0, latency_mean)
+        self.latency_stddev = max(0.0, latency_stddev)
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Seconds to sleep before returning an image"""
+        mean, stddev = self.latency_mean, self.latency_stddev
+        if mean == 0 or stddev == 0 or self.latency_distribution == LATENCY_FIXED:
+            return mean
+
+        with self.rng_lock:
+            if self.latency_distribution == LATENCY_UNIFORM:
+                # Uniform on [mean - a, mean + a] has a standard deviation of a / sqrt(3)
+                half_width = min(mean, stddev * math.sqrt(3))
+                return self.rng.uniform(mean - half_width, mean + half_width)
+
+            # Parameters of the underlying normal giving the requested mean and stddev
+            sigma = math.sqrt(math.log(1 + (stddev / mean) ** 2))
+            mu = math.log(mean) - sigma ** 2 / 2
+            return self.rng.lognormvariate(mu, sigma)
+
+    def render(self, animal: str, text: str) -> bytes:
+        """Deterministic PNG for the pair"""
+        digest = hashlib.sha256(f"{animal}\x1f{text}".encode()).digest()
+        pixels = random.Random(digest).randbytes(self.width * self.height * 3)
+
+        row_size = self.width * 3
+        # Filter type 0 (None) in front of every scanline
+        raw = b"".join(
+            b"\x00" + pixels[offset:offset + row_size]
+            for offset in range(0, len(pixels), row_size)
+        )
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw, 1))
+            + chunk(b"IEND", b"")
+        )
+
+    def generate(self, animal: str, text: str) -> bytes:
+        time.sleep(self.sample_latency())
+        return self.render(animal, text)
+
+
+def create_image_generator() -> ImageGenerator:
+    """Build the generator selected by IMAGE_GENERATOR"""
+    if settings.IMAGE_GENERATOR == "replicate":
+        return ReplicateImageGenerator(settings.REPLICATE_MODEL)
+    if settings.IMAGE_GENERATOR == "stub":
+        return StubImageGenerator(
+            width=settings.STUB_IMAGE_WIDTH,
+            height=settings.STUB_IMAGE_HEIGHT,
+            latency_distribution=settings.STUB_LATENCY_DISTRIBUTION,
+            latency_mean=settings.STUB_LATENCY_MEAN,
+            latency_stddev=settings.STUB_LATENCY_STDDEV,
+            seed=settings.STUB_SEED,
+        )
+    raise ValueError(f"Unknown IMAGE_GENERATOR: {settings.IMAGE_GENERATOR}")
@@ -0,0 +1,38 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Generation takes seconds to minutes; the other stages are much faster
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+STAGE_SECONDS = Histogram(
+    "task_stage_seconds",
+    "Time spent in each stage of processing a task",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+TASK_SECONDS = Histogram(
+    "task_processing_seconds",
+    "Time from picking up a task to its final status",
+    buckets=STAGE_BUCKETS,
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "task_queue_wait_seconds",
+    "Time from task creation until a consumer started it",
+    buckets=STAGE_BUCKETS + (600, 1800, 3600),
+)
+TASKS_PROCESSED = Counter(
+    "tasks_processed",
+    "Tasks handled by this consumer, by outcome",
+    ["status"],
+)
+GENERATION_CACHE_HITS = Counter(
+    "generation_cache_hits",
+    "Tasks served from the generation cache",
+)
+TASKS_IN_FLIGHT = Gauge(
+    "consumer_tasks_in_flight",
+    "Tasks currently being processed by this consumer",
+)
+CONCURRENCY = Gauge(
+    "consumer_concurrency",
+    "Maximum tasks processed in parallel by this consumer",
+)
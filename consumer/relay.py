@@ -0,0 +1,54 @@
+"""
+Standalone outbox relay, for deployments that run the API with
+OUTBOX_RELAY_ENABLED=false. At least one relay must run somewhere, or
+created tasks stay in the outbox and are never queued.
+
+    python -m consumer.relay
+"""
+import asyncio
+import logging
+import signal
+
+from dotenv import load_dotenv
+
+from app.core.config import settings
+from app.core.db.session import AsyncSessionLocal, async_engine
+from app.core.redis import get_redis
+from app.services.outbox_relay import OutboxRelay
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+)
+logger = logging.getLogger('outbox_relay')
+
+
+async def main() -> None:
+    redis_client = await get_redis()
+    relay = OutboxRelay(
+        AsyncSessionLocal,
+        redis_client,
+        batch_size=settings.OUTBOX_RELAY_BATCH_SIZE,
+        interval=settings.OUTBOX_RELAY_INTERVAL,
+        engine=async_engine,
+    )
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+
+    await relay.start()
+    logger.info("Outbox relay started")
+    try:
+        await stopped.wait()
+    finally:
+        await relay.stop()
+        await redis_client.close()
+        await async_engine.dispose()
+        logger.info("Outbox relay stopped")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+import httpx
+
+
+@contextmanager
+def open_output_stream(output, http_client: httpx.Client, chunk_size: int) -> Iterator[Tuple[Iterator[bytes], Optional[int]]]:
+    """
+    Stream a generator output without reading it into memory
+
+    Yields:
+        (chunk iterator, expected size from Content-Length or None)
+    """
+    if isinstance(output, (bytes, bytearray)):
+        # Already in memory, e.g. from the stub generator
+        yield iter((bytes(output),)), len(output)
+        return
+
+    url = getattr(output, "url", None)
+    if not url or url.startswith("data:"):
+        # Inline outputs carry no length; iterate the SDK object directly
+        yield iter(output), None
+        return
+
+    with http_client.stream("GET", url) as response:
+        response.raise_for_status()
+        content_length = response.headers.get("Content-Length")
+        expected_size = int(content_length) if content_length is not None else None
+        yield response.iter_bytes(chunk_size), expected_size
+